@@ -2,20 +2,25 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import tempfile
 import os
+import io
 import pyperclip
 
+from batch_utils import build_workbook_deck
 from chart_utils import (
+    ChartData,
+    create_chart,
     detect_multi_metric,
-    grouped_bar_chart,
-    stacked_bar_chart,
-    radar_chart,
+    numeric_text_columns,
     suggest_chart_types,
-    MCKINSEY_COLORS,
 )
 from insight_utils import generate_insights
+from pptx_utils import render_figure
+from profile_utils import profile_table
+from workbook_utils import WORKBOOK_CACHE_MB, WorkbookCache, parse_workbook, workbook_key
 
 st.set_page_config(
     page_title="ExcelInsight",
@@ -59,11 +64,100 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Sheets whose chart gallery stays cached
+GALLERY_CACHE_SHEETS = 32
+
+REDUCTION_LABELS = {
+    "group": "duplicate categories summed",
+    "top_n": "largest kept, the rest grouped as Other",
+    "bucket": "summed into equal date ranges",
+    "lttb": "downsampled along the axis",
+}
+
+@st.cache_resource
+def workbook_cache():
+    """Parsed workbooks shared by every rerun and session of this server"""
+    return WorkbookCache(WORKBOOK_CACHE_MB * 1024 * 1024)
+
+def load_workbook(uploaded_file):
+    """Parsed sheets of an upload; each distinct file content is parsed only once"""
+    # Hash each upload once; reruns reuse the key for the same file_id
+    keys = st.session_state.setdefault('workbook_keys', {})
+    key = keys.get(uploaded_file.file_id)
+    if key is None:
+        key = keys[uploaded_file.file_id] = workbook_key(uploaded_file.getvalue())
+    return key, workbook_cache().get(key, lambda: parse_workbook(uploaded_file.getvalue()))
+
+@st.cache_resource(max_entries=GALLERY_CACHE_SHEETS)
+def chart_gallery(workbook_key, sheet_name, _df, cat_col, num_cols):
+    """
+    Figures for every suggested chart type of a sheet, plus its insights
+
+    Built once per sheet: the figures and insights are computed concurrently
+    in a thread pool, so switching chart types afterwards only looks them up.
+    """
+    num_cols = list(num_cols)
+    chart_types = suggest_chart_types(_df, cat_col, num_cols)
+    # Reduce and extract the columns once; every chart type reuses them
+    data = ChartData(_df)
+    arrays, reduction = data.columns(cat_col, num_cols)
+    with ThreadPoolExecutor(max_workers=len(chart_types) + 1) as pool:
+        insights = pool.submit(generate_insights, _df, cat_col, num_cols)
+        figures = {
+            chart_type: pool.submit(create_chart, _df, {"type": chart_type, "columns": [cat_col, *num_cols]}, data)
+            for chart_type in chart_types
+        }
+    return {
+        "chart_types": chart_types,
+        "figures": {chart_type: future.result() for chart_type, future in figures.items()},
+        "insights": insights.result(),
+        "reduction": reduction,
+        "rows": len(arrays[cat_col]),
+    }
+
+def batch_deck_section(key, workbook):
+    """Build one deck covering every sheet of the workbook, with progress"""
+    st.markdown("### 📚 Batch Deck")
+    if st.button(f"Build deck from all {len(workbook.sheet_names)} sheets"):
+        progress_bar = st.progress(0.0, text="Analyzing sheets...")
+        buffer = io.BytesIO()
+        summary = build_workbook_deck(
+            workbook,
+            buffer,
+            progress=lambda done, total, message: progress_bar.progress(done / total, text=message),
+        )
+        progress_bar.empty()
+        st.session_state['batch_deck'] = (key, buffer.getvalue(), summary)
+
+    batch = st.session_state.get('batch_deck')
+    if batch is None or batch[0] != key:
+        return
+    _, deck, summary = batch
+    st.success(
+        f"✅ {summary['slides']} chart slides from {len(summary['sheets'])} of "
+        f"{len(workbook.sheet_names)} sheets in {summary['seconds']:.1f} s "
+        f"(workbook parsed in {workbook.parse_seconds:.1f} s)"
+    )
+    if summary['failed_charts']:
+        st.warning(f"⚠️ {summary['failed_charts']} chart(s) could not be rendered and were left out of the deck")
+    if summary['skipped']:
+        with st.expander(f"{len(summary['skipped'])} sheet(s) skipped"):
+            for name, reason in summary['skipped'].items():
+                st.markdown(f"- **{name}**: {reason}")
+    st.download_button(
+        label="Download Deck",
+        data=deck,
+        file_name="excelinsight_deck.pptx",
+        mime="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        on_click="ignore",
+    )
+
 def main():
     st.markdown('<h1 class="main-header">📊 ExcelInsight</h1>', unsafe_allow_html=True)
     st.markdown("**Transform your Excel data into interactive charts and professional presentations**")
 
     deck_preview = st.checkbox("🖥️ Deck Preview Mode", value=False)
+    gallery_mode = st.checkbox("🖼️ Gallery Mode", value=False, help="Show every suggested chart type side by side.")
 
     st.markdown("### 📁 Upload Excel File")
     uploaded_file = st.file_uploader(
@@ -72,70 +166,87 @@ def main():
         help="Maximum file size: 20 MB"
     )
     if uploaded_file is not None:
-        file_size = len(uploaded_file.getvalue())
+        file_size = uploaded_file.size
         if file_size > 20 * 1024 * 1024:
             st.error("❌ File size exceeds 20 MB limit. Please upload a smaller file.")
             return
         try:
-            excel_file = pd.ExcelFile(uploaded_file)
-            sheet_names = excel_file.sheet_names
+            with st.spinner("Reading workbook..."):
+                key, workbook = load_workbook(uploaded_file)
+            sheet_names = workbook.sheet_names
             if not sheet_names:
                 st.error("❌ No sheets found in the Excel file.")
                 return
             st.success(f"✅ File uploaded successfully! Found {len(sheet_names)} sheet(s).")
+            if len(sheet_names) > 1:
+                batch_deck_section(key, workbook)
             st.markdown("### 📋 Select Sheet")
             selected_sheet = st.selectbox(
                 "Choose a sheet to analyze:",
                 sheet_names,
                 index=0
             )
-            with st.spinner("Loading data..."):
-                try:
-                    df = pd.read_excel(uploaded_file, sheet_name=selected_sheet)
-                except Exception as e:
-                    st.error(f"❌ Error loading sheet '{selected_sheet}': {str(e)}")
-                    return
+            try:
+                df = workbook.sheet(selected_sheet)
+            except Exception as e:
+                st.error(f"❌ Error loading sheet '{selected_sheet}': {str(e)}")
+                return
             st.markdown("### 📊 Data Overview")
+            # Profiled once per sheet and shared with the deck's profiling slide
+            stats = workbook.stats(selected_sheet)
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Rows", len(df))
+                st.metric("Rows", stats['rows'])
             with col2:
-                st.metric("Columns", len(df.columns))
+                st.metric("Columns", len(stats['columns']))
             with col3:
-                st.metric("Memory Usage", f"{df.memory_usage(deep=True).sum() / 1024:.1f} KB")
+                st.metric("Memory Usage", f"{stats['memory_bytes'] / 1024:.1f} KB")
+            with st.expander("Column profile"):
+                st.dataframe(profile_table(stats), use_container_width=True, hide_index=True)
             st.markdown("#### Preview of Data")
             st.dataframe(df.head(10), use_container_width=True)
 
-            cat_col, num_cols = detect_multi_metric(df)
+            profile = workbook.profile(selected_sheet)
+            numeric_text = numeric_text_columns(profile)
+            if numeric_text:
+                st.caption(f"🔢 Numbers stored as text, not charted: {', '.join(map(str, numeric_text))}")
+
+            cat_col, num_cols = detect_multi_metric(df, profile=profile)
             if cat_col and num_cols:
                 st.markdown("### 📊 Multi-Metric Chart Options")
                 st.caption("💡 Suggested chart type based on data")
                 st.markdown(f"**Detected X (category):** `{cat_col}`")
                 st.markdown(f"**Detected Y (metrics):** `{', '.join(num_cols)}`")
 
-                chart_types = suggest_chart_types(df, cat_col, num_cols)
+                # Every suggested chart (aggregated/downsampled so large sheets
+                # stay light in the browser) and the insights, built once per sheet
+                with st.spinner("Building charts..."):
+                    gallery = chart_gallery(key, selected_sheet, df, cat_col, tuple(num_cols))
+                reduction = gallery["reduction"]
+                if reduction["method"] != "none":
+                    st.caption(
+                        f"📉 Plotting {gallery['rows']:,} of {reduction['categories']:,} categories "
+                        f"({REDUCTION_LABELS[reduction['method']]}): "
+                        f"{reduction['payload_saved']:.1%} fewer points sent to the browser"
+                    )
+
+                if gallery_mode:
+                    st.markdown("#### 🖼️ Chart Gallery")
+                    columns = st.columns(2)
+                    for i, (gallery_type, gallery_fig) in enumerate(gallery["figures"].items()):
+                        with columns[i % 2]:
+                            st.markdown(f"**{gallery_type}**")
+                            st.plotly_chart(gallery_fig, use_container_width=True, key=f"gallery_{gallery_type}")
+
                 chart_type = st.selectbox(
                     "Suggested Chart Type",
-                    chart_types,
+                    gallery["chart_types"],
                     help="Choose a chart style to preview.",
                 )
-
-                # Chart rendering logic
-                if chart_type == "Grouped Bar":
-                    fig = grouped_bar_chart(df, cat_col, num_cols)
-                elif chart_type == "Stacked Bar":
-                    fig = stacked_bar_chart(df, cat_col, num_cols)
-                elif chart_type == "Radar":
-                    fig = radar_chart(df, cat_col, num_cols)
-                elif chart_type == "Pie":
-                    fig = px.pie(df, names=cat_col, values=num_cols[0], color_discrete_sequence=MCKINSEY_COLORS)
-                elif chart_type == "Treemap":
-                    fig = px.treemap(df, path=[cat_col], values=num_cols[0], color_discrete_sequence=MCKINSEY_COLORS)
-                else:
-                    fig = None
+                fig = gallery["figures"][chart_type]
 
                 # Generate insights
-                auto_insights = generate_insights(df, cat_col, num_cols)
+                auto_insights = gallery["insights"]
                 if 'edited_insights' not in st.session_state:
                     st.session_state['edited_insights'] = auto_insights.copy()
                 # If number of insights changed, reset
@@ -162,13 +273,14 @@ def main():
                         st.session_state['edited_insights'][i] = edited
                         st.markdown(f"- {edited}")
 
-                # Download PNG
-                img_bytes = fig.to_image(format="png", width=1100, height=600)
+                # Download PNG, rendered only when clicked and on Streamlit's
+                # download thread, so reruns never wait for Kaleido
                 st.download_button(
                     label="Download PNG",
-                    data=img_bytes,
+                    data=lambda: render_figure(fig, width=1100, height=600),
                     file_name=f"{chart_type.replace(' ', '_').lower()}.png",
                     mime="image/png",
+                    on_click="ignore",
                 )
 
                 # Copy slide text button
@@ -0,0 +1,101 @@
+import time
+
+from chart_utils import detect_multi_metric, suggest_chart_types
+from insight_utils import generate_insights
+from pptx_utils import create_workbook_deck
+
+def analyze_sheet(df, profile=None):
+    """
+    Detect the chart pattern of a sheet and derive its insights and charts
+
+    Args:
+        df: pandas DataFrame of one sheet
+        profile: column profile of the sheet from chart_utils.profile_columns
+
+    Returns:
+        dict: 'cat_col', 'num_cols', 'insights' and 'charts' (chart candidate
+        dictionaries), or None when the sheet has no multi-metric pattern
+    """
+    cat_col, num_cols = detect_multi_metric(df, profile=profile)
+    if not cat_col or not num_cols:
+        return None
+    return {
+        'cat_col': cat_col,
+        'num_cols': num_cols,
+        'insights': generate_insights(df, cat_col, num_cols),
+        'charts': [
+            {"type": chart_type, "columns": [cat_col, *num_cols]}
+            for chart_type in suggest_chart_types(df, cat_col, num_cols)
+        ],
+    }
+
+def build_workbook_deck(workbook, output_path, progress=None):
+    """
+    Build one deck covering every sheet of a parsed workbook
+
+    Sheets are analyzed one after another while the charts of sheets already
+    analyzed render on the shared render pool. Sheets that failed to parse
+    or have no multi-metric pattern are skipped.
+
+    Args:
+        workbook: ParsedWorkbook from workbook_utils.parse_workbook()
+        output_path: path or file object to save the PowerPoint file to
+        progress: optional callable(done, total, message); a sheet counts
+            once when analyzed and once when its slides are added
+
+    Returns:
+        dict: 'sheets' (names included), 'skipped' (name -> reason),
+        'slides' (chart slides), 'failed_charts' (charts that could not be
+        built or rendered), 'seconds' (wall time) and 'timings' (seconds
+        per stage: 'detect', 'chart', 'render', 'save')
+    """
+    start = time.perf_counter()
+    names = workbook.sheet_names
+    total = 2 * len(names)
+    included = []
+    skipped = {}
+    steps = 0
+    n_charts = 0
+    timings = {'detect': 0.0}
+
+    def report(message, n_steps=1):
+        nonlocal steps
+        steps += n_steps
+        if progress is not None:
+            progress(steps, total, message)
+
+    def analyzed_sheets():
+        nonlocal n_charts
+        for i, name in enumerate(names):
+            message = f"Analyzed sheet {i + 1}/{len(names)}: {name}"
+            detect_start = time.perf_counter()
+            try:
+                analysis = analyze_sheet(workbook.sheet(name), workbook.profile(name))
+            except Exception as e:
+                skipped[name] = str(e)
+                analysis = None
+            timings['detect'] += time.perf_counter() - detect_start
+            if analysis is None:
+                skipped.setdefault(name, "no multi-metric pattern")
+                # No slides to wait for, so the sheet is already done
+                report(message, n_steps=2)
+                continue
+            included.append(name)
+            n_charts += len(analysis['charts'])
+            report(message)
+            yield {'name': name, 'df': workbook.sheet(name), **analysis}
+
+    slides = create_workbook_deck(
+        analyzed_sheets(),
+        output_path,
+        progress=lambda done, name: report(f"Added slides for {name}"),
+        timings=timings,
+    )
+    return {
+        'sheets': included,
+        'skipped': skipped,
+        'slides': slides,
+        'failed_charts': n_charts - slides,
+        'seconds': time.perf_counter() - start,
+        'timings': timings,
+    }
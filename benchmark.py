@@ -0,0 +1,179 @@
+"""
+Benchmarks for ExcelInsight
+
+Times the analysis steps behind the Streamlit app on synthetic sheets so
+performance changes can be compared run to run.
+
+Usage: python benchmark.py [--suite insights ...] [--sizes 1000 1000000]
+"""
+import argparse
+import io
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from batch_utils import build_workbook_deck
+from chart_utils import ChartData, create_chart, grouped_bar_chart, reduce_chart_data
+from image_utils import shared_image_cache
+from insight_utils import generate_insights
+from pptx_utils import RENDER_WORKERS, create_powerpoint_deck, render_figures
+from workbook_utils import PARSE_WORKERS, WorkbookCache, parse_workbook, workbook_key
+
+DEFAULT_ROWS = [1_000, 10_000, 100_000, 1_000_000]
+N_METRICS = 30
+# About 20 MB as .xlsx, the app's upload limit
+WORKBOOK_ROWS = [260_000]
+DECK_CHARTS = [1, 5, 10, 30]
+CHART_ROWS = [1_000, 10_000, 200_000]
+BATCH_SHEETS = [10, 40]
+
+def make_sheet(n_rows, n_metrics=N_METRICS, seed=0):
+    """Synthetic sheet: one text category column and ``n_metrics`` numeric columns."""
+    rng = np.random.default_rng(seed)
+    data = {"Segment": [f"Segment {i}" for i in range(n_rows)]}
+    for j in range(n_metrics):
+        data[f"Metric {j + 1}"] = rng.integers(100, 120, n_rows)
+    return pd.DataFrame(data)
+
+def bench_insights(rows):
+    print(f"\nInsight generation ({N_METRICS} metric columns)")
+    print(f"{'rows':>12}  {'seconds':>9}")
+    for n_rows in rows:
+        df = make_sheet(n_rows)
+        metric_cols = list(df.columns[1:])
+        start = time.perf_counter()
+        generate_insights(df, "Segment", metric_cols)
+        print(f"{n_rows:>12,}  {time.perf_counter() - start:>9.4f}")
+
+def make_workbook(n_rows, seed=0):
+    """Synthetic .xlsx bytes: a large 'Data' sheet of float metrics and a small 'Summary' sheet."""
+    rng = np.random.default_rng(seed)
+    data = {"Segment": [f"Segment {i}" for i in range(n_rows)]}
+    for j in range(10):
+        data[f"Metric {j + 1}"] = rng.normal(1000, 250, n_rows).round(2)
+    df = pd.DataFrame(data)
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        df.to_excel(writer, sheet_name="Data", index=False)
+        df.head(20).to_excel(writer, sheet_name="Summary", index=False)
+    return buffer.getvalue()
+
+def bench_workbook(rows):
+    print("\nWorkbook loading per app rerun")
+    print(f"{'rows':>12}  {'MB':>6}  {'reparse':>9}  {'first':>9}  {'cached':>9}")
+    for n_rows in rows:
+        data = make_workbook(n_rows)
+        # Previous app flow: list sheets, then read the selected sheet again
+        start = time.perf_counter()
+        pd.ExcelFile(io.BytesIO(data)).sheet_names
+        pd.read_excel(io.BytesIO(data), sheet_name="Data")
+        reparse = time.perf_counter() - start
+        cache = WorkbookCache(float("inf"))
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            cache.get(workbook_key(data), lambda: parse_workbook(data)).sheet("Data")
+            timings.append(time.perf_counter() - start)
+        print(f"{n_rows:>12,}  {len(data) / 1e6:>6.1f}  {reparse:>9.3f}  {timings[0]:>9.3f}  {timings[1]:>9.4f}")
+
+def deck_specs(n_charts, metric_cols):
+    """n_charts distinct chart specs cycling through the chart types and metric pairs."""
+    pairs = list(itertools.combinations(metric_cols, 2))
+    chart_types = ["Grouped Bar", "Stacked Bar", "Radar"]
+    specs = []
+    for i in range(n_charts):
+        pair = pairs[(i // len(chart_types)) % len(pairs)]
+        specs.append({"type": chart_types[i % len(chart_types)], "columns": ["Segment", *pair]})
+    return specs
+
+def bench_deck(sizes):
+    print(f"\nDeck export ({RENDER_WORKERS} render workers)")
+    print(f"{'charts':>12}  {'build':>9}  {'shared':>9}  {'export':>9}  {'repeat':>9}  {'renders':>8}")
+    cache = shared_image_cache()
+    # Warm the renderers so no column pays start-up
+    warm_up = make_sheet(12, n_metrics=2, seed=max(sizes) + 1)
+    render_figures([create_chart(warm_up, {"type": "Grouped Bar", "columns": list(warm_up.columns)})])
+    for n_charts in sizes:
+        df = make_sheet(1_000, n_metrics=8, seed=n_charts)
+        specs = deck_specs(n_charts, list(df.columns[1:]))
+        # Figure construction alone: columns extracted per chart vs once per deck
+        start = time.perf_counter()
+        for spec in specs:
+            create_chart(df, spec)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        data = ChartData(df)
+        for spec in specs:
+            create_chart(df, spec, data=data)
+        shared = time.perf_counter() - start
+        # Full export; the repeat is served from the image cache
+        timings = []
+        for _ in range(2):
+            misses = cache.stats()["misses"]
+            start = time.perf_counter()
+            create_powerpoint_deck(df, specs, io.BytesIO())
+            timings.append(time.perf_counter() - start)
+        renders = cache.stats()["misses"] - misses
+        print(f"{n_charts:>12,}  {build:>9.3f}  {shared:>9.3f}  {timings[0]:>9.3f}  {timings[1]:>9.3f}  {renders:>8}")
+
+def bench_charts(sizes):
+    print("\nGrouped bar figure, all rows vs reduced (2 metric columns)")
+    print(f"{'rows':>12}  {'raw s':>9}  {'raw KB':>10}  {'reduced s':>9}  {'reduced KB':>10}  {'saved':>7}")
+    for n_rows in sizes:
+        df = make_sheet(n_rows, n_metrics=2)
+        metric_cols = list(df.columns[1:])
+        timings, payloads = [], []
+        for reduce in (None, "auto"):
+            start = time.perf_counter()
+            payload = len(grouped_bar_chart(df, "Segment", metric_cols, reduce=reduce).to_json())
+            timings.append(time.perf_counter() - start)
+            payloads.append(payload)
+        _, info = reduce_chart_data(df, "Segment", metric_cols)
+        print(f"{n_rows:>12,}  {timings[0]:>9.3f}  {payloads[0] / 1024:>10,.0f}  {timings[1]:>9.3f}  "
+              f"{payloads[1] / 1024:>10,.0f}  {info['payload_saved']:>7.1%}")
+
+def make_multi_sheet_workbook(n_sheets, n_rows=2_000, seed=0):
+    """Synthetic .xlsx bytes with ``n_sheets`` sheets of 60 categories and 4 float metrics."""
+    rng = np.random.default_rng(seed)
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer) as writer:
+        for k in range(n_sheets):
+            data = {"Region": [f"Region {i % 60}" for i in range(n_rows)]}
+            for j in range(4):
+                data[f"Metric {j + 1}"] = rng.normal(100, 20, n_rows).round(2)
+            pd.DataFrame(data).to_excel(writer, sheet_name=f"Sheet {k + 1}", index=False)
+    return buffer.getvalue()
+
+def bench_batch(sizes):
+    print(f"\nBatch deck over every sheet ({PARSE_WORKERS} parse workers, {RENDER_WORKERS} render workers)")
+    print(f"{'sheets':>12}  {'parse 1':>9}  {'parse N':>9}  {'deck':>9}  {'slides':>8}")
+    for n_sheets in sizes:
+        data = make_multi_sheet_workbook(n_sheets, seed=n_sheets)
+        serial = parse_workbook(data, workers=1).parse_seconds
+        workbook = parse_workbook(data)
+        summary = build_workbook_deck(workbook, io.BytesIO())
+        print(f"{n_sheets:>12,}  {serial:>9.3f}  {workbook.parse_seconds:>9.3f}  "
+              f"{summary['seconds']:>9.3f}  {summary['slides']:>8}")
+
+# Suite -> (benchmark, default sizes)
+SUITES = {
+    "insights": (bench_insights, DEFAULT_ROWS),
+    "workbook": (bench_workbook, WORKBOOK_ROWS),
+    "deck": (bench_deck, DECK_CHARTS),
+    "charts": (bench_charts, CHART_ROWS),
+    "batch": (bench_batch, BATCH_SHEETS),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ExcelInsight analysis steps")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Rows, charts for the deck suite or sheets for the batch suite (default: per suite)")
+    parser.add_argument("--suite", choices=sorted(SUITES), nargs="+", default=sorted(SUITES), help="Benchmarks to run")
+    args = parser.parse_args()
+    for suite in args.suite:
+        bench, default_sizes = SUITES[suite]
+        bench(args.sizes or default_sizes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+class SharedLRUCache:
+    """Thread-safe LRU cache bounded by the total size of its entries"""
+
+    def __init__(self, max_bytes: float, sizeof: Callable[[Any], int]):
+        """
+        Args:
+            max_bytes: total size above which least recently used entries
+                are evicted (the newest entry is always kept)
+            sizeof: returns the size in bytes of a cached value
+        """
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._n_bytes = 0
+        self._lock = threading.Lock()
+        self._build_locks = {}
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for ``key``, building it on a miss
+
+        Concurrent misses on the same key build the value only once; the
+        other callers wait for it.
+
+        Args:
+            key: hashable cache key
+            build: builds the value when it is not cached
+
+        Returns:
+            the cached value
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key][0]
+            try:
+                value = build()
+                size = self._sizeof(value)
+            except Exception:
+                # A failed build caches nothing; the next caller builds again
+                with self._lock:
+                    self._build_locks.pop(key, None)
+                raise
+            with self._lock:
+                self._insert(key, value, size)
+                self._build_locks.pop(key, None)
+                self._evict()
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value for ``key`` without building it
+
+        Args:
+            key: hashable cache key
+
+        Returns:
+            the cached value, or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key: Hashable, value: Any) -> List[Tuple[Hashable, Any]]:
+        """
+        Store a value built elsewhere, replacing any cached one
+
+        Args:
+            key: hashable cache key
+            value: the value to cache
+
+        Returns:
+            list: (key, value) of each entry evicted to make room, oldest first
+        """
+        size = self._sizeof(value)
+        with self._lock:
+            self._insert(key, value, size)
+            return self._evict()
+
+    def _insert(self, key, value, size):
+        if key in self._entries:
+            self._n_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self._n_bytes += size
+
+    def _evict(self):
+        evicted = []
+        while self._n_bytes > self.max_bytes and len(self._entries) > 1:
+            key, (value, size) = self._entries.popitem(last=False)
+            self._n_bytes -= size
+            evicted.append((key, value))
+        return evicted
+
+    def stats(self) -> dict:
+        """
+        Current cache occupancy
+
+        Returns:
+            dict: 'entries' and 'bytes' held
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._n_bytes}
@@ -1,4 +1,5 @@
 import pandas as pd
+import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
@@ -25,31 +26,118 @@ MCKINSEY_COLOR_DICT = {
     "Charcoal": "#58595B",
 }
 
+# Largest number of categories a chart plots; the smallest are bucketed as "Other"
+MAX_CHART_CATEGORIES = 50
+
+# Largest number of points plotted along an ordered (numeric or date) axis
+MAX_CHART_POINTS = 500
+
+# Rows sampled per column when profiling a sheet
+PROFILE_SAMPLE_ROWS = 1000
+
+# Share of sampled text values that must parse as numbers for a column to count as numbers stored as text
+NUMERIC_TEXT_SHARE = 0.95
+
 # Example usage in Plotly:
 # import plotly.express as px
 # fig = px.bar(df, x=..., y=..., color=..., color_discrete_sequence=MCKINSEY_COLORS)
 
-def detect_multi_metric(df):
-    """Detects if the dataframe has 1 categorical and >=2 numeric columns."""
-    df = df.copy()
+def _sample_positions(n_rows, sample_rows):
+    if n_rows <= sample_rows:
+        return np.arange(n_rows)
+    # Evenly spaced rows, so sorted or blocked sheets are covered end to end
+    return np.unique(np.linspace(0, n_rows - 1, sample_rows).astype(np.int64))
+
+def _estimate_distinct(sample, n_rows):
+    """Distinct non-null values in a column of n_rows, estimated from a row sample (bias-corrected Chao1)."""
+    values = sample.dropna()
+    if values.empty:
+        return 0
+    counts = values.value_counts(sort=False).to_numpy()
+    if len(sample) >= n_rows:
+        return len(counts)
+    n_values = n_rows * len(values) / len(sample)
+    singletons = int((counts == 1).sum())
+    if singletons == len(values):
+        # No repeats at all: most likely a key column
+        return int(round(n_values))
+    # Many values seen once relative to twice means many were never sampled
+    doubletons = int((counts == 2).sum())
+    estimate = len(counts) + singletons * (singletons - 1) / (2 * (doubletons + 1))
+    return int(min(round(estimate), n_values))
+
+def profile_columns(df, sample_rows=PROFILE_SAMPLE_ROWS):
+    """
+    Profile every column of a sheet without copying it.
+
+    Types come from the dtypes; text columns are additionally checked on an
+    evenly spaced sample of at most ``sample_rows`` rows for numbers stored
+    as text. Returns a dict of column -> {'kind' ('numeric', 'datetime' or
+    'text'), 'numeric' (numeric dtype), 'numeric_share' (share of sampled
+    non-null values that parse as numbers), 'cardinality' (estimated
+    distinct non-null values)}.
+    """
+    n_rows = len(df)
+    positions = _sample_positions(n_rows, sample_rows)
+    profile = {}
+    for col, dtype in df.dtypes.items():
+        sample = df[col].iloc[positions]
+        numeric = pd.api.types.is_numeric_dtype(dtype)
+        if numeric:
+            kind, numeric_share = "numeric", 1.0
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            kind, numeric_share = "datetime", 0.0
+        else:
+            kind = "text"
+            values = sample.dropna()
+            numeric_share = float(pd.to_numeric(values, errors="coerce").notna().mean()) if len(values) else 0.0
+        profile[col] = {
+            "kind": kind,
+            "numeric": numeric,
+            "numeric_share": numeric_share,
+            "cardinality": _estimate_distinct(sample, n_rows),
+        }
+    return profile
+
+def _is_text_dtype(dtype):
+    # Text is dtype object before pandas 3 and the string dtype ("str") from pandas 3
+    return pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)
+
+def detect_multi_metric(df, profile=None):
+    """Detects if the dataframe has 1 categorical and >=2 numeric columns.
+
+    Reads dtypes only, never the data; pass ``profile`` (from profile_columns)
+    to avoid falling back to a column of numbers stored as text as the category.
+    """
+    dtypes = df.dtypes
     # Heuristic: treat first column as category if it's object or 'Unnamed'
     columns = list(df.columns)
     first_col = columns[0]
+    first_name = str(first_col).lower()
     if (
-        df[first_col].dtype == object
-        or first_col.lower().startswith("unnamed")
-        or first_col.lower() in ["segment", "category", "index", "id"]
+        _is_text_dtype(dtypes.iloc[0])
+        or first_name.startswith("unnamed")
+        or first_name in ["segment", "category", "index", "id"]
     ):
         cat_col = first_col
     else:
-        # fallback: first object column
-        obj_cols = [c for c in columns if df[c].dtype == object]
+        # fallback: first text column, preferring one that holds labels over numbers stored as text
+        obj_cols = [c for c, dtype in dtypes.items() if _is_text_dtype(dtype)]
+        if profile is not None:
+            obj_cols.sort(key=lambda c: profile[c]["numeric_share"] >= NUMERIC_TEXT_SHARE)
         cat_col = obj_cols[0] if obj_cols else columns[0]
-    num_cols = [c for c in columns if c != cat_col and pd.api.types.is_numeric_dtype(df[c])]
+    num_cols = [c for c, dtype in dtypes.items() if c != cat_col and pd.api.types.is_numeric_dtype(dtype)]
     if len(num_cols) >= 2:
         return cat_col, num_cols
     return None, None
 
+def numeric_text_columns(profile):
+    """Columns whose sampled values are numbers stored as text, so they are not charted as metrics."""
+    return [
+        col for col, info in profile.items()
+        if info["kind"] == "text" and info["numeric_share"] >= NUMERIC_TEXT_SHARE
+    ]
+
 def mckinsey_layout(title, x_title, y_title):
     """Returns a Plotly layout dict with McKinsey-style settings."""
     return dict(
@@ -92,84 +180,254 @@ def mckinsey_layout(title, x_title, y_title):
         width=1100,
     )
 
-def grouped_bar_chart(df, cat_col, num_cols):
-    fig = go.Figure()
-    for i, col in enumerate(num_cols):
-        fig.add_trace(
-            go.Bar(
-                x=df[cat_col],
-                y=df[col],
-                name=col,
-                marker_color=MCKINSEY_COLORS[i % len(MCKINSEY_COLORS)],
-            )
+def _is_ordered_axis(series):
+    """True when categories have a natural order (numbers or dates), so points can be downsampled in place."""
+    return (
+        pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+    ) or pd.api.types.is_datetime64_any_dtype(series)
+
+def _lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: positions of n_out points that keep the shape of (x, y)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    every = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        # Average of the next bucket is the third triangle vertex
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
         )
-    fig.update_layout(
-        **mckinsey_layout(
-            f"Grouped Bar: {', '.join(num_cols)} by {cat_col}",
-            cat_col,
-            "Value",
-        ),
-        barmode="group",
-    )
-    return fig
-
-def stacked_bar_chart(df, cat_col, num_cols):
-    fig = go.Figure()
-    for i, col in enumerate(num_cols):
-        fig.add_trace(
-            go.Bar(
-                x=df[cat_col],
-                y=df[col],
-                name=col,
-                marker_color=MCKINSEY_COLORS[i % len(MCKINSEY_COLORS)],
-            )
+        a = start + int(area.argmax())
+        indices[i + 1] = a
+    indices[-1] = n - 1
+    return indices
+
+def _axis_values(series):
+    """Float positions of an ordered (numeric or date) axis."""
+    x = series.to_numpy()
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    return x.astype(np.float64)
+
+def reduce_chart_data(df, cat_col, num_cols, method="auto", max_categories=MAX_CHART_CATEGORIES, max_points=MAX_CHART_POINTS):
+    """
+    Aggregate or downsample chart rows before they become Plotly traces.
+
+    Rows pass through unchanged unless there are more than the method's
+    limit. Past it, duplicate categories are summed first, and if that is
+    still too many rows:
+    - "top_n" keeps the max_categories - 1 largest categories by total and
+      sums the rest into one "Other" bucket. Numeric axes (IDs, years) are
+      treated as categories.
+    - "bucket" sums an ordered (numeric or date) axis into max_points equal
+      ranges, each labelled by its first value.
+    - "lttb" downsamples an ordered axis to max_points with
+      Largest-Triangle-Three-Buckets. It keeps the shape of a line but
+      drops rows, so it is only meant for line traces.
+    "top_n" and "bucket" preserve column totals. "auto" picks "bucket" for
+    date axes and "top_n" otherwise; "group" only sums duplicates; None
+    passes rows through.
+
+    Returns (frame, info): the cat_col and num_cols columns to plot, and a
+    dict with the method applied ("none" when nothing changed), the number
+    of input rows and categories, and points (values) in and out with the
+    share of payload saved.
+    """
+    frame = df[[cat_col] + list(num_cols)]
+    info = {"method": "none", "rows": len(frame), "categories": len(frame)}
+    ordered = _is_ordered_axis(frame[cat_col])
+    if method == "auto":
+        method = "bucket" if pd.api.types.is_datetime64_any_dtype(frame[cat_col]) else "top_n"
+    limit = max_points if method in ("bucket", "lttb") else max_categories
+
+    if method is not None and len(frame) > limit and not frame[cat_col].is_unique:
+        frame = (
+            frame.groupby(cat_col, sort=ordered, dropna=False, observed=True)[list(num_cols)]
+            .sum(min_count=1)
+            .reset_index()
         )
-    fig.update_layout(
-        **mckinsey_layout(
-            f"Stacked Bar: {', '.join(num_cols)} by {cat_col}",
-            cat_col,
-            "Value",
-        ),
-        barmode="stack",
-    )
-    return fig
-
-def radar_chart(df, cat_col, num_cols):
-    fig = go.Figure()
-    for i, col in enumerate(num_cols):
-        fig.add_trace(
-            go.Scatterpolar(
-                r=df[col],
-                theta=df[cat_col],
-                fill="toself",
-                name=col,
-                line_color=MCKINSEY_COLORS[i % len(MCKINSEY_COLORS)],
-            )
+        info["method"] = "group"
+    info["categories"] = len(frame)
+
+    if method == "top_n" and len(frame) > max_categories:
+        totals = frame[list(num_cols)].sum(axis=1)
+        keep = np.sort(totals.to_numpy().argsort(kind="stable")[::-1][:max_categories - 1])
+        rest = np.setdiff1d(np.arange(len(frame)), keep)
+        other = frame.iloc[rest][list(num_cols)].sum(min_count=1)
+        other[cat_col] = f"Other ({len(rest):,})"
+        frame = pd.concat([frame.iloc[keep], other.to_frame().T], ignore_index=True)
+        frame[list(num_cols)] = frame[list(num_cols)].apply(pd.to_numeric)
+        info["method"] = "top_n"
+    elif method == "bucket" and ordered and len(frame) > max_points:
+        frame = frame.sort_values(cat_col, kind="stable", na_position="last")
+        known = int(frame[cat_col].notna().sum())
+        x = _axis_values(frame[cat_col].iloc[:known])
+        edges = np.linspace(x[0], x[-1], max_points + 1)
+        buckets = np.minimum(np.searchsorted(edges, x, side="right") - 1, max_points - 1)
+        # Rows with no axis value stay together in one last bucket
+        buckets = np.concatenate([buckets, np.full(len(frame) - known, max_points)])
+        firsts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        sums = frame[list(num_cols)].groupby(buckets).sum(min_count=1)
+        frame = pd.concat(
+            [frame[[cat_col]].iloc[firsts].reset_index(drop=True), sums.reset_index(drop=True)],
+            axis=1,
         )
-    fig.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                showgrid=False,
-                showline=True,
-                linewidth=1,
-                linecolor="#222",
-                tickfont=dict(size=13),
-            ),
-            angularaxis=dict(
-                tickfont=dict(size=13),
-                rotation=90,
-                direction="clockwise",
-            ),
-        ),
-        showlegend=True,
-        **mckinsey_layout(
-            f"Radar: {', '.join(num_cols)} by {cat_col}",
-            "",
-            "",
-        ),
-    )
-    return fig
+        info["method"] = "bucket"
+    elif method == "lttb" and ordered and len(frame) > max_points:
+        frame = frame.sort_values(cat_col, kind="stable").dropna(subset=[cat_col])
+        x = _axis_values(frame[cat_col])
+        y = frame[list(num_cols)].fillna(0).to_numpy(dtype=np.float64).sum(axis=1)
+        frame = frame.iloc[_lttb_indices(x, y, max_points)]
+        info["method"] = "lttb"
+
+    info["points_in"] = info["rows"] * len(num_cols)
+    info["points_out"] = len(frame) * len(num_cols)
+    info["payload_saved"] = 1 - info["points_out"] / info["points_in"] if info["points_in"] else 0.0
+    return frame, info
+
+# Built once and shared by every figure; each chart only swaps in its titles
+_BASE_LAYOUT = mckinsey_layout("", "", "")
+
+_RADAR_POLAR = dict(
+    radialaxis=dict(
+        visible=True,
+        showgrid=False,
+        showline=True,
+        linewidth=1,
+        linecolor="#222",
+        tickfont=dict(size=13),
+    ),
+    angularaxis=dict(
+        tickfont=dict(size=13),
+        rotation=90,
+        direction="clockwise",
+    ),
+)
+
+def _chart_layout(title, x_title, y_title, **extra):
+    """Shared McKinsey layout with this chart's titles; only the changed branches are copied."""
+    return {
+        **_BASE_LAYOUT,
+        "title": {**_BASE_LAYOUT["title"], "text": title},
+        "xaxis": {**_BASE_LAYOUT["xaxis"], "title": x_title},
+        "yaxis": {**_BASE_LAYOUT["yaxis"], "title": y_title},
+        **extra,
+    }
+
+class ChartData:
+    """
+    Column arrays of one DataFrame, extracted once and shared by every chart built from it.
+
+    Rows are reduced with reduce_chart_data() once per category/metrics
+    combination, so a deck of N charts over the same columns pays for the
+    aggregation and the array extraction only once.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._columns = {}
+
+    def columns(self, cat_col, num_cols, reduce="auto"):
+        """
+        Returns (arrays, info): a dict of column name -> numpy array for
+        cat_col and num_cols after reduction, and the reduction info.
+        """
+        key = (cat_col, tuple(num_cols), reduce)
+        if key not in self._columns:
+            frame, info = reduce_chart_data(self.df, cat_col, num_cols, method=reduce)
+            arrays = {col: frame[col].to_numpy() for col in [cat_col, *num_cols]}
+            self._columns[key] = (arrays, info)
+        return self._columns[key]
+
+def _bar_figure(arrays, cat_col, num_cols, label, barmode):
+    traces = [
+        dict(
+            type="bar",
+            x=arrays[cat_col],
+            y=arrays[col],
+            name=col,
+            marker=dict(color=MCKINSEY_COLORS[i % len(MCKINSEY_COLORS)]),
+        )
+        for i, col in enumerate(num_cols)
+    ]
+    layout = _chart_layout(f"{label}: {', '.join(num_cols)} by {cat_col}", cat_col, "Value", barmode=barmode)
+    return go.Figure(data=traces, layout=layout)
+
+def _grouped_bar(arrays, cat_col, num_cols):
+    return _bar_figure(arrays, cat_col, num_cols, "Grouped Bar", "group")
+
+def _stacked_bar(arrays, cat_col, num_cols):
+    return _bar_figure(arrays, cat_col, num_cols, "Stacked Bar", "stack")
+
+def _radar(arrays, cat_col, num_cols):
+    traces = [
+        dict(
+            type="scatterpolar",
+            r=arrays[col],
+            theta=arrays[cat_col],
+            fill="toself",
+            name=col,
+            line=dict(color=MCKINSEY_COLORS[i % len(MCKINSEY_COLORS)]),
+        )
+        for i, col in enumerate(num_cols)
+    ]
+    layout = _chart_layout(f"Radar: {', '.join(num_cols)} by {cat_col}", "", "", polar=_RADAR_POLAR, showlegend=True)
+    return go.Figure(data=traces, layout=layout)
+
+def _pie(arrays, cat_col, num_cols):
+    frame = pd.DataFrame({cat_col: arrays[cat_col], num_cols[0]: arrays[num_cols[0]]})
+    return px.pie(frame, names=cat_col, values=num_cols[0], color_discrete_sequence=MCKINSEY_COLORS)
+
+def _treemap(arrays, cat_col, num_cols):
+    frame = pd.DataFrame({cat_col: arrays[cat_col], num_cols[0]: arrays[num_cols[0]]})
+    return px.treemap(frame, path=[cat_col], values=num_cols[0], color_discrete_sequence=MCKINSEY_COLORS)
+
+# Chart type (lower case) -> builder taking (arrays, cat_col, num_cols)
+CHART_BUILDERS = {
+    "grouped bar": _grouped_bar,
+    "stacked bar": _stacked_bar,
+    "radar": _radar,
+    "pie": _pie,
+    "treemap": _treemap,
+}
+
+def create_chart(df, chart_info, data=None, reduce="auto"):
+    """
+    Build the figure described by a chart spec.
+
+    chart_info is a dict with 'type' (one of CHART_BUILDERS, any case, e.g.
+    "Grouped Bar") and 'columns' (the category column followed by the metric
+    columns). Pass the same ChartData as ``data`` when building several
+    charts from one DataFrame so its columns are extracted only once.
+    """
+    chart_type = chart_info["type"].lower().replace("_", " ")
+    if chart_type not in CHART_BUILDERS:
+        raise ValueError(f"Unknown chart type: {chart_info['type']}")
+    cat_col, *num_cols = chart_info["columns"]
+    if not num_cols:
+        raise ValueError("A chart needs a category column and at least one metric column")
+    if data is None:
+        data = ChartData(df)
+    arrays, _ = data.columns(cat_col, num_cols, reduce)
+    return CHART_BUILDERS[chart_type](arrays, cat_col, num_cols)
+
+def grouped_bar_chart(df, cat_col, num_cols, reduce="auto"):
+    return create_chart(df, {"type": "grouped bar", "columns": [cat_col, *num_cols]}, reduce=reduce)
+
+def stacked_bar_chart(df, cat_col, num_cols, reduce="auto"):
+    return create_chart(df, {"type": "stacked bar", "columns": [cat_col, *num_cols]}, reduce=reduce)
+
+def radar_chart(df, cat_col, num_cols, reduce="auto"):
+    return create_chart(df, {"type": "radar", "columns": [cat_col, *num_cols]}, reduce=reduce)
 
 def generate_insights(df, cat_col, num_cols):
     """Returns 1-3 simple bullet points as insights."""
@@ -0,0 +1,154 @@
+"""
+Command-line deck generation for ExcelInsight
+
+Turns every workbook matched by the given files, directories or glob
+patterns into a PowerPoint deck covering all of its sheets, without the
+Streamlit UI, and reports where the time went for each file.
+
+Usage: python cli.py reports/ "exports/**/*.xlsx" [--output-dir decks] [--jobs 4]
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pptx_utils
+from batch_utils import build_workbook_deck
+from workbook_utils import parse_workbook
+
+WORKBOOK_EXTENSIONS = (".xlsx", ".xls")
+STAGES = ["parse", "detect", "chart", "render", "save"]
+
+def _same_file_key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+def find_workbooks(inputs):
+    """Workbook paths from files, directories (searched recursively) and glob patterns, in order without duplicates."""
+    paths = []
+    # Keyed by absolute path, so e.g. "a.xlsx" and "./a.xlsx" are built once
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(glob.glob(os.path.join(item, "**", "*"), recursive=True))
+        else:
+            matches = sorted(glob.glob(item, recursive=True)) or [item]
+        for path in matches:
+            name = os.path.basename(path)
+            # Skip Excel's lock files (~$Book.xlsx) alongside open workbooks
+            if path.lower().endswith(WORKBOOK_EXTENSIONS) and not name.startswith("~$") and _same_file_key(path) not in seen:
+                seen.add(_same_file_key(path))
+                paths.append(path)
+    return paths
+
+def deck_paths(paths, output_dir):
+    """
+    Output .pptx path for each workbook
+
+    The deck is named after the full workbook filename (Book.xlsx ->
+    Book.xlsx.pptx), so Book.xls and Book.xlsx get separate decks. It goes
+    next to the workbook, or under ``output_dir`` at the workbook's path
+    relative to the folder all the inputs share, so equally named
+    workbooks from different folders do not overwrite each other.
+    """
+    if not output_dir:
+        return [f"{path}.pptx" for path in paths]
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+    return [os.path.join(output_dir, f"{os.path.relpath(os.path.abspath(path), base)}.pptx") for path in paths]
+
+def process_workbook(path, output_path):
+    """
+    Build the deck for one workbook
+
+    Returns:
+        dict: 'path', 'output', 'sheets', 'slides', 'failed_charts',
+        'timings' (seconds per stage) and 'seconds', or 'path' and 'error'
+        when the file failed
+    """
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        # Files are already processed in parallel; one parse process each
+        workbook = parse_workbook(data, workers=1)
+        summary = build_workbook_deck(workbook, output_path)
+    except Exception as e:
+        return {"path": path, "error": f"{type(e).__name__}: {e}"}
+    return {
+        "path": path,
+        "output": output_path,
+        "sheets": f"{len(summary['sheets'])}/{len(workbook.sheet_names)}",
+        "slides": summary["slides"],
+        "failed_charts": summary["failed_charts"],
+        "timings": {"parse": workbook.parse_seconds, **summary["timings"]},
+        "seconds": time.perf_counter() - start,
+    }
+
+def _init_worker():
+    # Each file worker renders its own charts on one thread rather than
+    # starting a render pool per worker on top of the file pool
+    pptx_utils.RENDER_WORKERS = 1
+
+def print_result(result):
+    if "error" in result:
+        print(f"FAILED {result['path']}: {result['error']}", file=sys.stderr)
+        return
+    timings = "  ".join(f"{result['timings'].get(stage, 0.0):>7.2f}" for stage in STAGES)
+    print(f"{result['sheets']:>7}  {result['slides']:>6}  {result['failed_charts']:>6}  {timings}  "
+          f"{result['seconds']:>7.2f}  {result['path']}", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a PowerPoint deck from each Excel workbook")
+    parser.add_argument("inputs", nargs="+", help="Workbook files, directories or glob patterns")
+    parser.add_argument("--output-dir", help="Directory for the decks (default: next to each workbook)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Workbooks processed in parallel (default: CPU cores)")
+    args = parser.parse_args()
+
+    paths = find_workbooks(args.inputs)
+    if not paths:
+        parser.error("no .xlsx or .xls files found")
+    outputs = deck_paths(paths, args.output_dir)
+    targets = {}
+    for path, output in zip(paths, outputs):
+        targets.setdefault(_same_file_key(output), []).append(path)
+    clashes = [sources for sources in targets.values() if len(sources) > 1]
+    if clashes:
+        parser.error("several workbooks would write the same deck: "
+                     + "; ".join(" and ".join(sources) for sources in clashes))
+    for output in outputs:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+    start = time.perf_counter()
+    stages = "  ".join(f"{stage:>7}" for stage in STAGES)
+    print(f"{'sheets':>7}  {'slides':>6}  {'failed':>6}  {stages}  {'total':>7}  file")
+    jobs = min(args.jobs, len(paths))
+    results = []
+    if jobs <= 1:
+        for path, output in zip(paths, outputs):
+            results.append(process_workbook(path, output))
+            print_result(results[-1])
+    else:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        ) as pool:
+            futures = {pool.submit(process_workbook, path, output): path for path, output in zip(paths, outputs)}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # The worker process itself died, e.g. out of memory
+                    results.append({"path": futures[future], "error": f"{type(e).__name__}: {e}"})
+                print_result(results[-1])
+
+    failed = sum("error" in result for result in results)
+    failed_charts = sum(result.get("failed_charts", 0) for result in results)
+    print(f"\n{len(results) - failed} deck(s) built, {failed} failed, {failed_charts} chart(s) not rendered, "
+          f"in {time.perf_counter() - start:.2f}s with {jobs} job(s)")
+    return 1 if failed or failed_charts else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""
+A/B Test Engine for the Driver Profitability Dashboard
+
+Tests run on sufficient statistics: the per-group count, sum and sum of
+squares of the metric, plus the covariate sums CUPED needs. These come from
+the aggregate cube's cells or are accumulated as trips arrive, so a test
+costs the same for a thousand trips as for a hundred million, and many
+segments (e.g. every zone) are tested at once as arrays.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from data_generator import AB_GROUPS
+
+# Metric the A/B test compares
+AB_MEASURE = 'net_earnings'
+
+# Pre-treatment covariate used for CUPED variance reduction; trip distance
+# is not affected by the payout incentive but explains much of the earnings
+CUPED_COVARIATE = 'trip_distance_km'
+
+CONTROL, TREATMENT = AB_GROUPS
+
+class SufficientStats:
+    """Count and sums of a metric and a covariate for one or more segments"""
+
+    FIELDS = ('n', 'y_sum', 'y_sumsq', 'x_sum', 'x_sumsq', 'xy_sum')
+
+    def __init__(self, n_segments=1, **sums):
+        """
+        Args:
+            n_segments (int): Number of segments tracked side by side
+            **sums: Starting arrays for any of FIELDS (missing ones start at zero)
+        """
+        for field in self.FIELDS:
+            values = sums.get(field)
+            setattr(self, field, np.zeros(n_segments) if values is None else np.asarray(values, dtype=np.float64))
+
+    def update(self, y, x=None, segments=None):
+        """
+        Add observations, e.g. trips as they arrive
+
+        Args:
+            y (array-like): Metric values
+            x (array-like): Covariate values for CUPED, same length as y
+            segments (array-like): Segment number of each value; all segment 0 when None
+        """
+        y = np.asarray(y, dtype=np.float64)
+        segments = np.zeros(len(y), dtype=np.intp) if segments is None else np.asarray(segments)
+        n_segments = len(self.n)
+
+        def add(weights=None):
+            return np.bincount(segments, weights=weights, minlength=n_segments)
+
+        self.n += add()
+        self.y_sum += add(y)
+        self.y_sumsq += add(y * y)
+        if x is not None:
+            x = np.asarray(x, dtype=np.float64)
+            self.x_sum += add(x)
+            self.x_sumsq += add(x * x)
+            self.xy_sum += add(x * y)
+
+    def merge(self, other):
+        """
+        Add another accumulator's statistics to this one
+
+        Args:
+            other (SufficientStats): Statistics of the same segments
+
+        Returns:
+            SufficientStats: self
+        """
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        return self
+
+    def mean(self):
+        """Mean of the metric per segment"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.y_sum / self.n
+
+    def var(self):
+        """Sample variance of the metric per segment (NaN below two observations)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = (self.y_sumsq - self.y_sum ** 2 / self.n) / (self.n - 1)
+        return np.where(self.n > 1, np.maximum(var, 0.0), np.nan)
+
+def ab_segment_stats(cells, by=None, measure=AB_MEASURE, covariate=CUPED_COVARIATE):
+    """
+    Control and treatment statistics per segment, summed from cube cells
+
+    All segments are aggregated in one groupby over the cells.
+
+    Args:
+        cells (pd.DataFrame): Cube cells (usually from slice_cube)
+        by (str or list): Dimension(s) defining the segments; one overall segment when None
+        measure (str): Metric, one of CUBE_MEASURES
+        covariate (str): CUPED covariate, one of CUBE_MEASURES and paired
+            with ``measure`` in CUBE_PRODUCTS
+
+    Returns:
+        tuple: (segment index, control SufficientStats, treatment SufficientStats)
+    """
+    keys = ([] if by is None else [by] if isinstance(by, str) else list(by)) + ['ab_group']
+    columns = {
+        'n': 'count',
+        'y_sum': f'{measure}_sum',
+        'y_sumsq': f'{measure}_sumsq',
+        'x_sum': f'{covariate}_sum',
+        'x_sumsq': f'{covariate}_sumsq',
+        'xy_sum': f'{measure}_x_{covariate}_sum',
+    }
+    totals = cells.groupby(keys, observed=True)[list(columns.values())].sum()
+    if by is None:
+        totals.index = pd.MultiIndex.from_arrays([['All'] * len(totals), totals.index], names=['segment', 'ab_group'])
+    # One row per segment, one column block per group; absent groups have no trips
+    wide = totals.unstack('ab_group', fill_value=0)
+    segments = wide.index
+    groups = []
+    for group in (CONTROL, TREATMENT):
+        groups.append(SufficientStats(len(segments), **{
+            field: wide[column][group].to_numpy() if group in wide[column] else np.zeros(len(segments))
+            for field, column in columns.items()
+        }))
+    return segments, groups[0], groups[1]
+
+def _welch(diff, var_c, n_c, var_t, n_t):
+    """Welch t statistic, degrees of freedom and two-sided p-value"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        se_c = var_c / n_c
+        se_t = var_t / n_t
+        se = se_c + se_t
+        t = diff / np.sqrt(se)
+        dof = se ** 2 / (se_c ** 2 / (n_c - 1) + se_t ** 2 / (n_t - 1))
+        p = 2 * special.stdtr(dof, -np.abs(t))
+    return t, dof, p
+
+def welch_test(control, treatment):
+    """
+    Welch's t-test of treatment against control for every segment
+
+    Args:
+        control (SufficientStats): Control group statistics
+        treatment (SufficientStats): Treatment group statistics, same segments
+
+    Returns:
+        dict: Arrays 'diff', 'lift' (% of the control mean), 't', 'dof' and 'p'
+    """
+    mean_c, mean_t = control.mean(), treatment.mean()
+    diff = mean_t - mean_c
+    t, dof, p = _welch(diff, control.var(), control.n, treatment.var(), treatment.n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lift = diff / mean_c * 100
+    return {'diff': diff, 'lift': lift, 't': t, 'dof': dof, 'p': p}
+
+def cuped_test(control, treatment):
+    """
+    Welch's t-test on CUPED-adjusted metrics for every segment
+
+    The metric is adjusted by theta * (covariate - covariate mean), with
+    theta = cov(metric, covariate) / var(covariate) over both groups of the
+    segment. The adjustment leaves the expected difference unchanged and
+    removes the variance the covariate explains.
+
+    Args:
+        control (SufficientStats): Control group statistics, with covariate sums
+        treatment (SufficientStats): Treatment group statistics, same segments
+
+    Returns:
+        dict: Arrays 'diff', 'lift' (% of the control mean), 't', 'dof', 'p',
+            'theta' and 'variance_reduction' (share of variance removed)
+    """
+    pooled = SufficientStats(len(control.n)).merge(control).merge(treatment)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = pooled.xy_sum - pooled.x_sum * pooled.y_sum / pooled.n
+        var_x = pooled.x_sumsq - pooled.x_sum ** 2 / pooled.n
+        theta = np.where(var_x > 0, cov / var_x, 0.0)
+
+        def adjusted_var(stats):
+            # var(y - theta * x) from the group's sums
+            var_x = (stats.x_sumsq - stats.x_sum ** 2 / stats.n) / (stats.n - 1)
+            cov = (stats.xy_sum - stats.x_sum * stats.y_sum / stats.n) / (stats.n - 1)
+            return np.maximum(stats.var() - 2 * theta * cov + theta ** 2 * var_x, 0.0)
+
+        mean_c = control.mean()
+        diff = (treatment.mean() - mean_c) - theta * (treatment.x_sum / treatment.n - control.x_sum / control.n)
+        var_c, var_t = adjusted_var(control), adjusted_var(treatment)
+        t, dof, p = _welch(diff, var_c, control.n, var_t, treatment.n)
+        raw = control.var() / control.n + treatment.var() / treatment.n
+        reduction = 1 - (var_c / control.n + var_t / treatment.n) / raw
+        lift = diff / mean_c * 100
+    return {'diff': diff, 'lift': lift, 't': t, 'dof': dof, 'p': p,
+            'theta': theta, 'variance_reduction': reduction}
+
+def ab_test(cells, by=None):
+    """
+    A/B results per segment: means, lift and p-value, raw and CUPED-adjusted
+
+    Args:
+        cells (pd.DataFrame): Cube cells (usually from slice_cube)
+        by (str or list): Dimension(s) defining the segments; one 'All' row when None
+
+    Returns:
+        pd.DataFrame: One row per segment with 'control_n', 'treatment_n',
+            'control_mean', 'treatment_mean', 'lift', 'p', 'cuped_lift',
+            'cuped_p' and 'variance_reduction'
+    """
+    segments, control, treatment = ab_segment_stats(cells, by)
+    raw = welch_test(control, treatment)
+    cuped = cuped_test(control, treatment)
+    return pd.DataFrame({
+        'control_n': control.n.astype(np.int64),
+        'treatment_n': treatment.n.astype(np.int64),
+        'control_mean': control.mean(),
+        'treatment_mean': treatment.mean(),
+        'lift': raw['lift'],
+        'p': raw['p'],
+        'cuped_lift': cuped['lift'],
+        'cuped_p': cuped['p'],
+        'variance_reduction': cuped['variance_reduction'],
+    }, index=segments)
@@ -3,151 +3,222 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import datetime
-from datetime import timedelta
 import random
+import os
+import sys
+import time
 
-# --- Data generation and expense calculation helpers ---
-@st.cache_data
-def generate_trip_data(n_trips=1000):
-    zones = {
-        'Downtown': {'base_fare': 15, 'demand_factor': 1.2, 'surge_multiplier': 1.3},
-        'Etobicoke': {'base_fare': 12, 'demand_factor': 0.8, 'surge_multiplier': 1.1},
-        'North York': {'base_fare': 14, 'demand_factor': 1.0, 'surge_multiplier': 1.2},
-        'Scarborough': {'base_fare': 13, 'demand_factor': 0.9, 'surge_multiplier': 1.0},
-        'Mississauga': {'base_fare': 11, 'demand_factor': 0.7, 'surge_multiplier': 0.9},
-        'Brampton': {'base_fare': 10, 'demand_factor': 0.6, 'surge_multiplier': 0.8}
+from cube_utils import build_cube, slice_cube, cube_summary, cube_rollups, cube_total_means
+from index_utils import BitmapIndex
+from time_utils import TimeIndex, WEEKDAYS
+from source_utils import parse_source_args, source_version, load_trips, derive_trip_frame
+from cache_utils import SharedLRUCache
+from ab_utils import ab_test, AB_MEASURE, CONTROL, TREATMENT
+from resample_utils import resample_lift
+
+FILTER_DIMENSIONS = ['pickup_zone', 'driver_type', 'trip_bucket', 'ab_group']
+
+# Groupings the page's metrics, insights, recommendations and charts read,
+# all rolled up together by page_analytics
+PAGE_GROUPINGS = {
+    'zone': 'pickup_zone',
+    'hour': 'hour',
+    'bucket': 'trip_bucket',
+    'hour_zone': ['hour', 'pickup_zone'],
+    'weekday_hour': ['weekday', 'hour'],
+}
+
+# Measures averaged over all filtered trips (the metric tiles and cost card)
+PAGE_TOTALS = ['net_earnings', 'gas_cost', 'time_cost', 'wait_cost']
+
+# Per-filter results kept (resampling runs, comparison tables), keyed by dataset version and filter state
+RESULTS_CACHE_ENTRIES = 256
+
+# Metrics the comparison tool compares: label, reading of a difference, reading of none
+COMPARE_METRICS = {
+    'net_earnings': ("Net Earnings",
+                     "{high} drivers earn {pct:.1f}% more per trip than {low}, suggesting higher efficiency or better trip choices.",
+                     "No meaningful difference in net earnings per trip."),
+    'driver_payout': ("Driver Payout",
+                      "{high} drivers receive higher payouts, possibly due to more premium trips or better timing.",
+                      "No meaningful difference in driver payout per trip."),
+    'trip_distance_km': ("Trip Distance Km",
+                         "{high} drivers take longer trips on average, which may impact their earnings or trip strategy.",
+                         "No meaningful difference in trip distance per trip."),
+}
+
+# Copy-on-write makes the per-session shallow copies below safe read-only
+# views of the shared data (it is always on from pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+def build_dashboard_data(source):
+    start = time.perf_counter()
+    df = derive_trip_frame(load_trips(source))
+    cube = build_cube(df)
+    index = BitmapIndex(df, FILTER_DIMENSIONS)
+    time_index = TimeIndex(df)
+    n_bytes = (df.memory_usage(deep=True).sum() + cube.memory_usage(deep=True).sum()
+               + sum(bits.nbytes for bitmaps in index.bitmaps.values() for bits in bitmaps.values()))
+    load_info = {
+        'source': source or "simulated data",
+        'trips': len(df),
+        'seconds': time.perf_counter() - start,
+        'bytes': int(n_bytes),
     }
-    np.random.seed(42)
-    trip_ids = [f"TRIP_{i:06d}" for i in range(1, n_trips + 1)]
-    driver_ids = [f"DRIVER_{np.random.randint(1000, 9999)}" for _ in range(n_trips)]
-    pickup_zones = np.random.choice(list(zones.keys()), n_trips, p=[0.3, 0.15, 0.2, 0.15, 0.1, 0.1])
-    dropoff_zones = np.random.choice(list(zones.keys()), n_trips, p=[0.25, 0.2, 0.2, 0.15, 0.1, 0.1])
-    trip_distances = np.random.exponential(8, n_trips) + 1
-    trip_durations = trip_distances * np.random.uniform(2, 4, n_trips)
-    base_time = datetime.datetime(2024, 1, 1, 6, 0, 0)
-    pickup_times = [base_time + timedelta(
-        days=np.random.randint(0, 7),
-        hours=np.random.randint(0, 24),
-        minutes=np.random.randint(0, 60)
-    ) for _ in range(n_trips)]
-    driver_types = np.random.choice(['Full-time', 'Part-time'], n_trips, p=[0.6, 0.4])
-    ab_groups = np.random.choice(['Control', 'Treatment'], n_trips, p=[0.5, 0.5])
-    fare_amounts = []
-    driver_payouts = []
-    for i in range(n_trips):
-        pickup_zone = pickup_zones[i]
-        distance = trip_distances[i]
-        duration = trip_durations[i]
-        base_fare = zones[pickup_zone]['base_fare']
-        distance_fare = distance * 1.5
-        time_fare = duration * 0.3
-        surge_multiplier = zones[pickup_zone]['surge_multiplier']
-        total_fare = (base_fare + distance_fare + time_fare) * surge_multiplier
-        total_fare *= np.random.uniform(0.95, 1.05)
-        payout_multiplier = np.random.uniform(0.7, 0.8)
-        if ab_groups[i] == 'Treatment':
-            payout_multiplier += 0.05
-        if driver_types[i] == 'Full-time':
-            payout_multiplier += 0.03
-        driver_payout = total_fare * payout_multiplier
-        fare_amounts.append(round(total_fare, 2))
-        driver_payouts.append(round(driver_payout, 2))
-    wait_times = []
-    for i in range(n_trips):
-        hour = pickup_times[i].hour
-        zone = pickup_zones[i]
-        demand_factor = zones[zone]['demand_factor']
-        base_wait = np.random.exponential(3)
-        time_factor = 1.5 if hour < 6 or hour > 22 else 1.0
-        zone_factor = 1.5 if demand_factor < 0.9 else 1.0
-        wait_time = base_wait * time_factor * zone_factor
-        wait_times.append(round(wait_time, 1))
-    cancellations = np.random.choice([True, False], n_trips, p=[0.05, 0.95])
-    df = pd.DataFrame({
-        'trip_id': trip_ids,
-        'driver_id': driver_ids,
-        'pickup_zone': pickup_zones,
-        'dropoff_zone': dropoff_zones,
-        'trip_distance_km': trip_distances,
-        'trip_duration_min': trip_durations,
-        'pickup_time': pickup_times,
-        'fare_amount': fare_amounts,
-        'driver_payout': driver_payouts,
-        'wait_time_min': wait_times,
-        'cancellation': cancellations,
-        'driver_type': driver_types,
-        'ab_group': ab_groups
-    })
-    return df
-
-def calculate_driver_expenses(df):
-    df['gas_cost'] = df['trip_distance_km'] * 0.12
-    df['time_cost'] = df['trip_duration_min'] * 0.25
-    df['wait_cost'] = df['wait_time_min'] * 0.20
-    df['total_expenses'] = df['gas_cost'] + df['time_cost'] + df['wait_cost']
-    df['net_earnings'] = df['driver_payout'] - df['total_expenses']
-    df['profitability_ratio'] = df['net_earnings'] / df['trip_duration_min']
-    n_unprofitable = max(1, int(0.02 * len(df)))
-    unprofitable_indices = np.random.choice(df.index, n_unprofitable, replace=False)
-    df.loc[unprofitable_indices, 'net_earnings'] = -np.abs(np.random.uniform(1, 10, n_unprofitable))
-    df.loc[unprofitable_indices, 'profitability_ratio'] = df.loc[unprofitable_indices, 'net_earnings'] / df.loc[unprofitable_indices, 'trip_duration_min']
-    return df
+    return df, cube, index, time_index, load_info
+
+# One cache per server process, shared by every session
+@st.cache_resource
+def dataset_cache():
+    cache_mb = parse_source_args(sys.argv[1:]).cache_mb
+    return SharedLRUCache(max_bytes=cache_mb * 1e6, sizeof=lambda data: data[-1]['bytes'])
+
+def load_dashboard_data(source=None, version=None):
+    with st.spinner("Loading trip data..."):
+        df, cube, index, time_index, load_info = dataset_cache().get((source, version), lambda: build_dashboard_data(source))
+    # Sessions get shallow copies: no data is duplicated, and any write
+    # copies the affected column instead of touching the shared frame
+    return df.copy(deep=False), cube.copy(deep=False), index, time_index, load_info
+
+# Per-filter results are small (a few numbers or rows each), so this cache
+# is bounded by entry count: every entry has size 1
+@st.cache_resource
+def results_cache():
+    return SharedLRUCache(max_bytes=RESULTS_CACHE_ENTRIES, sizeof=lambda result: 1)
+
+def trip_positions(index, time_index, selections):
+    """Row positions of the filtered trips: bitmap filters, then the date range as a row range"""
+    days = selections['day']
+    positions = index.positions({dim: values for dim, values in selections.items() if dim != 'day'})
+    return time_index.restrict(positions, days.start, days.stop - 1)
+
+def date_range_filter(time_index):
+    """Sidebar pickup-date range as a range of day numbers"""
+    first, last = time_index.date(0), time_index.date(time_index.n_days - 1)
+    chosen = st.session_state.get('date_sel')
+    if not chosen or not all(first <= date <= last for date in chosen):
+        st.session_state['date_sel'] = (first, last)
+    chosen = st.sidebar.date_input("Pickup Dates", min_value=first, max_value=last, key='date_sel')
+    # While the end of the range is being picked only the start is set
+    start, end = (chosen[0], chosen[-1]) if chosen else (first, last)
+    return range(time_index.day_number(start), time_index.day_number(end) + 1)
+
+def filter_key(selections):
+    """Hashable form of a filter selection, independent of selection order"""
+    return tuple((dim, tuple(sorted(map(str, values)))) for dim, values in sorted(selections.items()))
+
+def data_source_picker():
+    default_source = parse_source_args(sys.argv[1:]).data or ''
+    source = st.sidebar.text_input("Trip data (file or folder)", value=default_source,
+                                   help="CSV, Parquet or Arrow file, or a folder of part files. Leave empty for simulated data.").strip()
+    if source and not os.path.exists(source):
+        st.sidebar.error(f"Data source not found: {source}. Using simulated data.")
+        source = ''
+    return source or None
 
 # --- Helper for plain-language insights ---
-def generate_plain_insights(df):
+def page_analytics(cells):
+    """
+    Every aggregate the page shows, from one pass over the filtered cells
+
+    Returns:
+        dict: Net earnings per PAGE_GROUPINGS name, as pd.Series, and
+            'overall', the PAGE_TOTALS means over all filtered trips
+    """
+    rollups = cube_rollups(cells, PAGE_GROUPINGS, ['net_earnings'])
+    analytics = {name: rollup['net_earnings'] for name, rollup in rollups.items()}
+    analytics['overall'] = cube_total_means(cells, PAGE_TOTALS)
+    return analytics
+
+def generate_plain_insights(analytics):
     insights = []
     # Earnings by region
-    region_earnings = df.groupby('pickup_zone')['net_earnings'].mean().sort_values(ascending=False)
+    region_earnings = analytics['zone'].sort_values(ascending=False)
     best_zone = region_earnings.index[0]
     worst_zone = region_earnings.index[-1]
     pct_diff = (region_earnings[best_zone] - region_earnings[worst_zone]) / region_earnings[worst_zone] * 100
     insights.append(f"{best_zone} drivers earn {pct_diff:.0f}% more per trip than {worst_zone}.")
     # Earnings by hour
-    hourly = df.groupby(df['pickup_time'].dt.hour)['net_earnings'].mean()
+    hourly = analytics['hour']
     best_hour = hourly.idxmax()
     worst_hour = hourly.idxmin()
     insights.append(f"Best hour: {best_hour}:00, Worst hour: {worst_hour}:00.")
     # Earnings by trip length
-    df['trip_bucket'] = pd.cut(df['trip_distance_km'], [0,5,10,100], labels=['Short','Medium','Long'])
-    trip_earn = df.groupby('trip_bucket')['net_earnings'].mean()
+    trip_earn = analytics['bucket']
     best_bucket = trip_earn.idxmax()
     insights.append(f"{best_bucket} trips are most profitable.")
     return insights
 
 # --- Helper for A/B badge ---
-def ab_test_badge(df):
-    control = df[df['ab_group']=='Control']['net_earnings']
-    treat = df[df['ab_group']=='Treatment']['net_earnings']
-    lift = (treat.mean() - control.mean()) / control.mean() * 100
-    # Use a simple t-test for p-value
-    from scipy.stats import ttest_ind
-    tstat, pval = ttest_ind(treat, control)
+def ab_test_badge(cells):
+    result = ab_test(cells).iloc[0]
+    if not (result['control_n'] > 1 and result['treatment_n'] > 1):
+        return "⚠️ Select both A/B groups to compare treatment with control.", "The A/B filter currently excludes one group."
+    lift, pval = result['lift'], result['p']
     badge = f"{'✅' if pval<0.05 else '⚠️'} Treatment group outperformed control by {lift:+.1f}% in net earnings. p = {pval:.3f}"
-    sub = "Suggest further testing across more regions."
+    sub = (f"CUPED (adjusted for trip distance): {result['cuped_lift']:+.1f}%, p = {result['cuped_p']:.3f}, "
+           f"{result['variance_reduction']:.0%} less variance. Suggest further testing across more regions.")
     return badge, sub
 
+def ab_zone_table(cells):
+    """Per-zone A/B results, every zone tested in one vectorized pass"""
+    zones = ab_test(cells, by='pickup_zone')
+    return pd.DataFrame({
+        'Control trips': zones['control_n'],
+        'Treatment trips': zones['treatment_n'],
+        'Lift %': zones['lift'].round(1),
+        'p': zones['p'].round(4),
+        'CUPED lift %': zones['cuped_lift'].round(1),
+        'CUPED p': zones['cuped_p'].round(4),
+    })
+
+def ab_group_values(df, index, time_index, selections, group):
+    """Metric values of one A/B group's filtered trips"""
+    allowed = [group] if group in selections['ab_group'] else []
+    positions = trip_positions(index, time_index, {**selections, 'ab_group': allowed})
+    return df[AB_MEASURE].to_numpy(dtype=np.float64)[positions]
+
+def ab_resample_panel(df, index, time_index, selections, data_key):
+    """Bootstrap CI and permutation p-value of the lift, computed on request and cached per filter state"""
+    key = ('resample', data_key, filter_key(selections))
+    cache = results_cache()
+    result = cache.peek(key)
+    if result is None:
+        if not st.button("Bootstrap CI & permutation test", help="Resamples the filtered trips; no normal approximation"):
+            return
+        control = ab_group_values(df, index, time_index, selections, CONTROL)
+        treatment = ab_group_values(df, index, time_index, selections, TREATMENT)
+        if len(control) < 2 or len(treatment) < 2:
+            st.caption("Select both A/B groups to resample.")
+            return
+        with st.spinner(f"Resampling {len(control) + len(treatment):,} trips..."):
+            result = cache.get(key, lambda: resample_lift(control, treatment))
+    st.caption(f"Bootstrap {result['ci_low']:+.1f}% to {result['ci_high']:+.1f}% (95% CI of the lift) · "
+               f"permutation p = {result['p']:.4f} · {result['resamples']:,} resamples"
+               f"{'' if result['bootstrap_converged'] else ' (CI hit the resample limit)'}, "
+               f"{result['permutations']:,} permutations"
+               f"{'' if result['permutation_converged'] else ' (p-value hit the resample limit)'}"
+               f" in {result['seconds']:.2f}s")
+
 # --- Helper for business recs ---
-def business_recs(df):
+def business_recs(analytics):
     recs = []
     # Find lowest zone/hour
-    hourly = df.groupby([df['pickup_time'].dt.hour, 'pickup_zone'])['net_earnings'].mean()
+    hourly = analytics['hour_zone']
     if not hourly.empty:
         idx = hourly.idxmin()
         recs.append(f"📉 Drivers earned least in {idx[1]} {idx[0]}–{idx[0]+1}h – consider higher wait-time bonus.")
     # Find low trip bucket
-    df['trip_bucket'] = pd.cut(df['trip_distance_km'], [0,5,10,100], labels=['Short','Medium','Long'])
-    trip_earn = df.groupby('trip_bucket')['net_earnings'].mean()
+    trip_earn = analytics['bucket']
     if not trip_earn.empty:
         low_bucket = trip_earn.idxmin()
         recs.append(f"🛣️ {low_bucket} trips are least profitable – review pricing or incentives.")
     return recs
 
 # --- Cost breakdown card ---
-def cost_breakdown_card(df):
-    avg_gas = df['gas_cost'].mean()
-    avg_time = df['time_cost'].mean()
-    avg_wait = df['wait_cost'].mean()
+def cost_breakdown_card(analytics):
+    avg_gas, avg_time, avg_wait = analytics['overall'][['gas_cost', 'time_cost', 'wait_cost']]
     st.markdown("""
     <div style='background:#fffbe7;padding:1rem;border-radius:0.5rem;border-left:5px solid #ffb300;margin-bottom:1rem;'>
     <b>Where does the money go?</b><br>
@@ -160,64 +231,70 @@ def cost_breakdown_card(df):
     """.format(avg_gas, avg_time, avg_wait), unsafe_allow_html=True)
 
 # --- Comparison tool ---
-def comparison_tool(df, compare_type, compare_options):
-    st.markdown("<b>Compare any two:</b>", unsafe_allow_html=True)
-    c1, c2 = st.columns(2)
-    with c1:
-        left = st.selectbox("First", compare_options, key="comp1")
-    with c2:
-        right = st.selectbox("Second", compare_options, key="comp2")
-    if left == right:
-        st.info("Select two different options.")
+def comparison_table(df, index, time_index, cells, selections, dim, with_medians, data_key):
+    """Every compared metric for every option of ``dim`` in one grouped pass, cached per filter state"""
+    measures = list(COMPARE_METRICS)
+
+    def build():
+        table = cube_summary(cells, dim, measures, confidence=0.95)
+        if with_medians:
+            # Medians need the trips themselves: one grouped pass over the filtered rows
+            trips = df[[dim, *measures]].take(trip_positions(index, time_index, selections))
+            table = table.join(trips.groupby(dim, observed=True)[measures].median().astype(np.float64).add_suffix('_median'))
+        return table
+
+    return results_cache().get(('compare', data_key, filter_key(selections), dim, with_medians), build)
+
+def comparison_tool(df, index, time_index, cells, selections, compare_type, compare_options, data_key):
+    st.markdown("<b>Compare any two or more:</b>", unsafe_allow_html=True)
+    picked = st.multiselect("Options", compare_options, default=compare_options[:2], key=f"comp_sel_{compare_type}")
+    if len(picked) < 2:
+        st.info("Select two or more different options.")
         return
-    if compare_type == 'zone':
-        left_df = df[df['pickup_zone']==left]
-        right_df = df[df['pickup_zone']==right]
-    else:
-        left_df = df[df['driver_type']==left]
-        right_df = df[df['driver_type']==right]
-    # Net Earnings
-    left_net = left_df['net_earnings'].mean()
-    right_net = right_df['net_earnings'].mean()
-    net_diff = left_net - right_net
-    net_pct = 100 * net_diff / right_net if right_net != 0 else 0
-    st.markdown(f"Net Earnings: {left}: <b>{left_net:.2f}</b>, {right}: <b>{right_net:.2f}</b>", unsafe_allow_html=True)
-    if abs(net_pct) > 1:
-        if net_pct > 0:
-            st.caption(f"{left} drivers earn {abs(net_pct):.1f}% more per trip than {right}, suggesting higher efficiency or better trip choices.")
-        else:
-            st.caption(f"{right} drivers earn {abs(net_pct):.1f}% more per trip than {left}, suggesting higher efficiency or better trip choices.")
-    else:
-        st.caption("No meaningful difference in net earnings per trip.")
-    # Driver Payout
-    left_payout = left_df['driver_payout'].mean()
-    right_payout = right_df['driver_payout'].mean()
-    payout_diff = left_payout - right_payout
-    payout_pct = 100 * payout_diff / right_payout if right_payout != 0 else 0
-    st.markdown(f"Driver Payout: {left}: <b>{left_payout:.2f}</b>, {right}: <b>{right_payout:.2f}</b>", unsafe_allow_html=True)
-    if abs(payout_pct) > 1:
-        if payout_pct > 0:
-            st.caption(f"{left} drivers receive higher payouts, possibly due to more premium trips or better timing.")
-        else:
-            st.caption(f"{right} drivers receive higher payouts, possibly due to more premium trips or better timing.")
-    else:
-        st.caption("No meaningful difference in driver payout per trip.")
-    # Trip Distance
-    left_dist = left_df['trip_distance_km'].mean()
-    right_dist = right_df['trip_distance_km'].mean()
-    dist_diff = left_dist - right_dist
-    dist_pct = 100 * dist_diff / right_dist if right_dist != 0 else 0
-    st.markdown(f"Trip Distance Km: {left}: <b>{left_dist:.2f}</b>, {right}: <b>{right_dist:.2f}</b>", unsafe_allow_html=True)
-    if abs(dist_pct) > 1:
-        if dist_pct > 0:
-            st.caption(f"{left} drivers take longer trips on average, which may impact their earnings or trip strategy.")
-        else:
-            st.caption(f"{right} drivers take longer trips on average, which may impact their earnings or trip strategy.")
-    else:
-        st.caption("No meaningful difference in trip distance per trip.")
+    with_medians = st.checkbox("Include medians and 95% CIs", key="comp_detail")
+    dim = 'pickup_zone' if compare_type == 'zone' else 'driver_type'
+    table = comparison_table(df, index, time_index, cells, selections, dim, with_medians, data_key).reindex(picked)
+    for measure, (label, more, same) in COMPARE_METRICS.items():
+        means = table[f'{measure}_mean']
+        values = ", ".join(f"{option}: <b>{value:.2f}</b>" for option, value in means.items())
+        st.markdown(f"{label}: {values}", unsafe_allow_html=True)
+        high, low = means.idxmax(), means.idxmin()
+        pct = 100 * (means[high] - means[low]) / abs(means[low]) if means[low] != 0 else 0
+        st.caption(more.format(high=high, low=low, pct=pct) if pct > 1 else same)
+    if with_medians:
+        detail = pd.DataFrame({'Trips': table['count']})
+        for measure, (label, _, _) in COMPARE_METRICS.items():
+            detail[f'{label} mean'] = table[f'{measure}_mean'].round(2)
+            detail[f'{label} 95% CI'] = [f"{low:.2f} – {high:.2f}" for low, high in
+                                         zip(table[f'{measure}_ci_low'], table[f'{measure}_ci_high'])]
+            detail[f'{label} median'] = table[f'{measure}_median'].round(2)
+        st.dataframe(detail, use_container_width=True)
+
+# --- Debug timings ---
+class RerunTimer:
+    """Wall time of each section of one rerun, for the debug panel"""
+
+    def __init__(self):
+        self.start = self._last = time.perf_counter()
+        self.sections = {}
+
+    def mark(self, section):
+        """Record the time since the previous mark as ``section``"""
+        now = time.perf_counter()
+        self.sections[section] = self.sections.get(section, 0.0) + now - self._last
+        self._last = now
+
+def debug_panel(timer):
+    total = time.perf_counter() - timer.start
+    with st.sidebar.expander(f"⏱️ Debug: rerun took {total * 1e3:.0f} ms"):
+        st.dataframe(pd.DataFrame({
+            'ms': [round(seconds * 1e3, 1) for seconds in timer.sections.values()],
+            'share': [f"{seconds / total:.0%}" for seconds in timer.sections.values()],
+        }, index=list(timer.sections)), use_container_width=True)
 
 # --- Main app ---
 def main():
+    timer = RerunTimer()
     st.set_page_config(page_title="Uber Driver Profitability", layout="wide")
     st.title("🚗 Driver Profitability Dashboard")
     st.info(
@@ -229,14 +306,20 @@ def main():
         "We use 'Treatment' and 'Control' groups to test different incentive or pricing strategies. This helps us see what works best for drivers.\n"
         "- For example, the Treatment group might receive a higher per-trip bonus than the Control group."
     )
-    df = generate_trip_data(1000)
-    df = calculate_driver_expenses(df)
+    st.sidebar.header("Data")
+    source = data_source_picker()
+    version = source_version(source)
+    df, cube, index, time_index, load_info = load_dashboard_data(source, version)
+    timer.mark('load data')
+    cache_stats = dataset_cache().stats()
+    st.sidebar.caption(f"{load_info['trips']:,} trips from {load_info['source']} · loaded in "
+                       f"{load_info['seconds']:.2f}s · {load_info['bytes'] / 1e6:.1f} MB · "
+                       f"cache: {cache_stats['entries']} dataset(s), {cache_stats['bytes'] / 1e6:.1f} MB")
     st.sidebar.header("Filters")
-    zones = list(df['pickup_zone'].unique())
-    types = list(df['driver_type'].unique())
-    df['trip_bucket'] = pd.cut(df['trip_distance_km'], [0,5,10,100], labels=['Short','Medium','Long'])
-    buckets = list(df['trip_bucket'].unique())
-    ab_opts = list(df['ab_group'].unique())
+    zones = list(cube['pickup_zone'].unique())
+    types = list(cube['driver_type'].unique())
+    buckets = list(cube['trip_bucket'].unique())
+    ab_opts = list(cube['ab_group'].unique())
 
     # --- RESET LOGIC ---
     if 'reset_filters' not in st.session_state:
@@ -252,6 +335,7 @@ def main():
         st.session_state['type_sel'] = types.copy()
         st.session_state['bucket_sel'] = buckets.copy()
         st.session_state['ab_sel'] = ab_opts.copy()
+        st.session_state.pop('date_sel', None)
         st.session_state['reset_filters'] = False
         st.rerun()
 
@@ -269,58 +353,83 @@ def main():
     type_sel = st.sidebar.multiselect("Driver Type", types, default=st.session_state['type_sel'], key='type_sel')
     bucket_sel = st.sidebar.multiselect("Trip Length", buckets, default=st.session_state['bucket_sel'], key='bucket_sel')
     ab_sel = st.sidebar.multiselect("A/B Group", ab_opts, default=st.session_state['ab_sel'], key='ab_sel')
+    day_range = date_range_filter(time_index)
 
-    # Apply filters
-    filtered = df[
-        df['pickup_zone'].isin(st.session_state['zone_sel']) &
-        df['driver_type'].isin(st.session_state['type_sel']) &
-        df['trip_bucket'].isin(st.session_state['bucket_sel']) &
-        df['ab_group'].isin(st.session_state['ab_sel'])
-    ]
+    # Apply filters to the cube cells; every widget below sums cells
+    selections = {
+        'pickup_zone': st.session_state['zone_sel'],
+        'driver_type': st.session_state['type_sel'],
+        'trip_bucket': st.session_state['bucket_sel'],
+        'ab_group': st.session_state['ab_sel'],
+        'day': day_range,
+    }
+    timer.mark('filters')
+    cells = slice_cube(cube, selections)
+    analytics = page_analytics(cells)
+    timer.mark('analytics pass')
     # --- Top metrics ---
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("💰 Avg Net Earnings", f"${filtered['net_earnings'].mean():.2f}")
+        st.metric("💰 Avg Net Earnings", f"${analytics['overall']['net_earnings']:.2f}")
     with col2:
-        best_zone = filtered.groupby('pickup_zone')['net_earnings'].mean().idxmax()
+        best_zone = analytics['zone'].idxmax()
         st.metric("📍 Best Zone", best_zone)
     with col3:
-        best_bucket = filtered.groupby('trip_bucket')['net_earnings'].mean().idxmax()
+        best_bucket = analytics['bucket'].idxmax()
         st.metric("🛣️ Best Trip Length", str(best_bucket))
     # --- Plain-language insights ---
     st.markdown("### Key Insights")
-    for insight in generate_plain_insights(filtered):
+    for insight in generate_plain_insights(analytics):
         st.info(insight)
+    timer.mark('metrics & insights')
     # --- A/B Test Badge ---
-    badge, ab_sub = ab_test_badge(filtered)
+    badge, ab_sub = ab_test_badge(cells)
     st.markdown(f"<div style='background:#e3f2fd;padding:0.7rem 1rem;border-radius:0.5rem;display:inline-block;font-weight:bold;'>{badge}</div>", unsafe_allow_html=True)
     st.caption(ab_sub)
+    ab_resample_panel(df, index, time_index, selections, (source, version))
+    with st.expander("A/B results by zone"):
+        st.dataframe(ab_zone_table(cells), use_container_width=True)
+    timer.mark('A/B test')
     # --- Visuals ---
     st.markdown("---")
     st.subheader("Earnings by Region")
     st.caption("Which pickup zones are most profitable for drivers? Use this to prioritize incentive programs and resource allocation.")
-    reg = filtered.groupby('pickup_zone')['net_earnings'].mean().sort_values()
+    reg = analytics['zone'].sort_values()
     fig1 = px.bar(reg, x=reg.values, y=reg.index, orientation='h', color=reg.values, color_continuous_scale='Blues', labels={'x':'Net Earnings','y':'Zone'})
     st.plotly_chart(fig1, use_container_width=True)
     st.subheader("Earnings by Trip Length")
     st.caption("Compare short, medium, and long trips. Use this to inform trip pricing and bonus strategies.")
-    tb = filtered.groupby('trip_bucket')['net_earnings'].mean()
+    tb = analytics['bucket']
     fig3 = px.bar(tb, x=tb.index, y=tb.values, color=tb.values, color_continuous_scale='Greens', labels={'x':'Trip Length','y':'Net Earnings'})
     st.plotly_chart(fig3, use_container_width=True)
+    st.subheader("Earnings by Hour and Weekday")
+    st.caption("When in the week do drivers earn the most? Use this to time surge incentives and driver nudges.")
+    heat = analytics['weekday_hour'].unstack('hour').rename(index=dict(enumerate(WEEKDAYS)))
+    fig4 = px.imshow(heat, aspect='auto', color_continuous_scale='RdYlGn', labels={'x': 'Hour', 'y': 'Weekday', 'color': 'Net Earnings'})
+    st.plotly_chart(fig4, use_container_width=True)
+    timer.mark('charts')
     # --- Cost breakdown card ---
     with st.sidebar:
-        cost_breakdown_card(filtered)
+        cost_breakdown_card(analytics)
     # --- Business Recommendations ---
     st.markdown("### Business Recommendations")
-    for rec in business_recs(filtered):
+    for rec in business_recs(analytics):
         st.warning(rec)
+    timer.mark('recommendations')
     # --- Comparison Tool ---
     st.markdown("---")
     st.markdown("### Compare Zones or Driver Types")
-    st.caption("Quickly compare two zones or driver types to see where Uber can make the biggest impact for drivers.")
+    st.caption("Quickly compare two or more zones or driver types to see where Uber can make the biggest impact for drivers.")
     comp_type = st.radio("Compare by", ['zone','driver_type'], horizontal=True)
-    options = list(filtered['pickup_zone'].unique()) if comp_type=='zone' else list(filtered['driver_type'].unique())
-    comparison_tool(filtered, comp_type, options)
+    options = list(cells['pickup_zone'].unique()) if comp_type=='zone' else list(cells['driver_type'].unique())
+    comparison_tool(df, index, time_index, cells, selections, comp_type, options, (source, version))
+    timer.mark('comparison')
+    # --- Filtered trips ---
+    positions = trip_positions(index, time_index, selections)
+    with st.expander(f"🔍 Filtered trips ({len(positions):,})"):
+        st.dataframe(df.iloc[positions[:100]], use_container_width=True)
+    timer.mark('filtered trips')
+    debug_panel(timer)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
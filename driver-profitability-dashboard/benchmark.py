@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Benchmark Script for Driver Profitability Dashboard
+
+This script times the data pipeline at different dataset sizes so that
+performance changes can be compared run to run.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from data_generator import (
+    generate_trip_data, iter_trip_chunks, write_trip_chunks, write_trip_parts,
+    write_trip_file, load_trip_file, TRIP_FILE_FORMATS,
+)
+from ab_utils import ab_test, CONTROL, TREATMENT
+from cube_utils import build_cube
+from index_utils import BitmapIndex
+from resample_utils import bootstrap_lifts, resample_lift
+from source_utils import load_trips, derive_trip_frame
+
+DEFAULT_SIZES = [1_000, 1_000_000, 10_000_000]
+
+def bench_generation(sizes):
+    """
+    Time generate_trip_data at each size and report rows/sec
+
+    Args:
+        sizes (list): Trip counts to generate
+    """
+    print("\n📊 Trip generation (generate_trip_data)")
+    print(f"   {'trips':>12}  {'seconds':>9}  {'rows/sec':>12}")
+    for n_trips in sizes:
+        start = time.perf_counter()
+        df = generate_trip_data(n_trips)
+        elapsed = time.perf_counter() - start
+        print(f"   {n_trips:>12,}  {elapsed:>9.3f}  {n_trips / elapsed:>12,.0f}")
+        del df
+
+def bench_streaming(sizes, chunk_size=100_000):
+    """
+    Compare peak traced memory of single-shot and chunked CSV generation
+
+    Args:
+        sizes (list): Trip counts to generate
+        chunk_size (int): Trips per streamed chunk
+    """
+    print(f"\n💾 CSV generation peak memory (chunk size {chunk_size:,})")
+    print(f"   {'trips':>12}  {'single-shot MB':>15}  {'streaming MB':>13}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, 'trips.csv')
+        for n_trips in sizes:
+            tracemalloc.start()
+            generate_trip_data(n_trips).to_csv(output_file, index=False)
+            single_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            tracemalloc.start()
+            write_trip_chunks(iter_trip_chunks(n_trips, chunk_size), output_file)
+            stream_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(f"   {n_trips:>12,}  {single_peak / 1e6:>15.1f}  {stream_peak / 1e6:>13.1f}")
+
+def bench_workers(sizes):
+    """
+    Time part-file generation of the largest size at increasing worker counts
+
+    Args:
+        sizes (list): Trip counts; only the largest is used
+    """
+    n_trips = max(sizes)
+    max_workers = os.cpu_count() or 1
+    worker_counts = sorted({1, max_workers} | {w for w in (2, 4, 8, 16) if w < max_workers})
+    print(f"\n⚙️  Parallel part-file generation ({n_trips:,} trips)")
+    print(f"   {'workers':>8}  {'seconds':>9}  {'speedup':>8}")
+    baseline = None
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            start = time.perf_counter()
+            write_trip_parts(n_trips, tmp_dir, workers=workers)
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"   {workers:>8}  {elapsed:>9.3f}  {baseline / elapsed:>7.2f}x")
+
+def bench_formats(sizes):
+    """
+    Compare file size and load time of CSV, Parquet and Arrow IPC output
+
+    Args:
+        sizes (list): Trip counts to generate
+    """
+    print("\n🗄️  Output formats (size on disk, load_trip_file time)")
+    print(f"   {'trips':>12}  {'format':>8}  {'MB':>9}  {'load s':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_trips in sizes:
+            df = generate_trip_data(n_trips)
+            for fmt, extensions in TRIP_FILE_FORMATS.items():
+                path = os.path.join(tmp_dir, f"trips{extensions[0]}")
+                write_trip_file(df, path, fmt)
+                start = time.perf_counter()
+                load_trip_file(path)
+                elapsed = time.perf_counter() - start
+                print(f"   {n_trips:>12,}  {fmt:>8}  {os.path.getsize(path) / 1e6:>9.1f}  {elapsed:>8.3f}")
+            del df
+
+# A typical sidebar selection: some zones, one driver type, two trip lengths
+FILTER_SELECTION = {
+    'pickup_zone': ['Downtown', 'North York', 'Etobicoke'],
+    'driver_type': ['Full-time'],
+    'trip_bucket': ['Short', 'Medium'],
+    'ab_group': ['Control', 'Treatment'],
+}
+
+def bench_filter(sizes, repeats=5):
+    """
+    Compare sidebar filter latency of chained isin masks and the bitmap index
+
+    Args:
+        sizes (list): Trip counts to generate
+        repeats (int): Timed repetitions per method (best is reported)
+    """
+    print(f"\n🔎 Filter latency (best of {repeats})")
+    print(f"   {'trips':>12}  {'build s':>8}  {'isin ms':>9}  {'bitmap ms':>10}  {'speedup':>8}")
+    for n_trips in sizes:
+        df = generate_trip_data(n_trips)
+        df['trip_bucket'] = pd.cut(df['trip_distance_km'], [0, 5, 10, 100], labels=['Short', 'Medium', 'Long'])
+
+        start = time.perf_counter()
+        index = BitmapIndex(df, list(FILTER_SELECTION))
+        build = time.perf_counter() - start
+
+        def isin_positions():
+            mask = np.ones(len(df), dtype=bool)
+            for dim, allowed in FILTER_SELECTION.items():
+                mask &= df[dim].isin(allowed).to_numpy()
+            return np.flatnonzero(mask)
+
+        timings = {}
+        for name, method in (('isin', isin_positions), ('bitmap', lambda: index.positions(FILTER_SELECTION))):
+            best = float('inf')
+            for _ in range(repeats):
+                start = time.perf_counter()
+                method()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        assert np.array_equal(isin_positions(), index.positions(FILTER_SELECTION))
+
+        print(f"   {n_trips:>12,}  {build:>8.3f}  {timings['isin'] * 1e3:>9.2f}  "
+              f"{timings['bitmap'] * 1e3:>10.2f}  {timings['isin'] / timings['bitmap']:>7.1f}x")
+        del df, index
+
+def bench_startup(sizes):
+    """
+    Time dashboard startup from a trip file: load, expenses, cube and index
+
+    Args:
+        sizes (list): Trip counts to write and load (5M is the reference size)
+    """
+    print("\n🚀 Dashboard startup from file")
+    print(f"   {'trips':>12}  {'format':>8}  {'load s':>8}  {'derive s':>9}  {'memory MB':>10}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_trips in sizes:
+            for fmt in ('csv', 'parquet'):
+                path = os.path.join(tmp_dir, f"trips{TRIP_FILE_FORMATS[fmt][0]}")
+                write_trip_chunks(iter_trip_chunks(n_trips), path, fmt)
+
+                start = time.perf_counter()
+                df = load_trips(path)
+                loaded = time.perf_counter()
+                df = derive_trip_frame(df)
+                build_cube(df)
+                BitmapIndex(df, list(FILTER_SELECTION))
+                derived = time.perf_counter()
+
+                memory_mb = df.memory_usage(deep=True).sum() / 1e6
+                print(f"   {n_trips:>12,}  {fmt:>8}  {loaded - start:>8.2f}  {derived - loaded:>9.2f}  {memory_mb:>10.1f}")
+                del df
+
+def bench_ab(sizes, repeats=5):
+    """
+    Compare an A/B t-test over raw trips with the cube-based A/B engine
+
+    Args:
+        sizes (list): Trip counts to generate
+        repeats (int): Timed repetitions per method (best is reported)
+    """
+    from scipy.stats import ttest_ind
+
+    print(f"\n🧪 A/B test latency (best of {repeats})")
+    print(f"   {'trips':>12}  {'raw ms':>9}  {'cube ms':>9}  {'by zone ms':>11}  {'CUPED var cut':>14}")
+    for n_trips in sizes:
+        df = derive_trip_frame(load_trips(n_trips=n_trips))
+        cube = build_cube(df)
+
+        def raw_test():
+            earnings = df['net_earnings'].to_numpy(dtype=np.float64)
+            groups = df['ab_group'].to_numpy()
+            return ttest_ind(earnings[groups == TREATMENT], earnings[groups == CONTROL], equal_var=False).pvalue
+
+        timings = {}
+        for name, method in (('raw', raw_test), ('cube', lambda: ab_test(cube)),
+                             ('zones', lambda: ab_test(cube, by='pickup_zone'))):
+            best = float('inf')
+            for _ in range(repeats):
+                start = time.perf_counter()
+                method()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        result = ab_test(cube).iloc[0]
+        assert np.isclose(raw_test(), result['p'], rtol=1e-6, atol=1e-300)
+
+        print(f"   {n_trips:>12,}  {timings['raw'] * 1e3:>9.2f}  {timings['cube'] * 1e3:>9.2f}  "
+              f"{timings['zones'] * 1e3:>11.2f}  {result['variance_reduction']:>13.0%}")
+        del df, cube
+
+def bench_resample(sizes, n_resamples=200, repeats=3):
+    """
+    Compare a per-resample NumPy loop with the batched bootstrap, and time
+    the full bootstrap + permutation run
+
+    Args:
+        sizes (list): Trip counts to generate
+        n_resamples (int): Bootstrap resamples timed for both methods
+        repeats (int): Timed repetitions per method (best is reported)
+    """
+    print(f"\n🎲 Bootstrap and permutation resampling ({n_resamples} resamples for the comparison, best of {repeats})")
+    print(f"   {'trips':>12}  {'loop s':>8}  {'batched s':>10}  {'full run s':>11}  {'draws':>11}  {'95% CI of lift':>18}")
+    for n_trips in sizes:
+        df = derive_trip_frame(load_trips(n_trips=n_trips))
+        earnings = df['net_earnings'].to_numpy(dtype=np.float64)
+        groups = df['ab_group'].to_numpy()
+        control, treatment = earnings[groups == CONTROL], earnings[groups == TREATMENT]
+
+        rng = np.random.default_rng(0)
+
+        def loop():
+            for _ in range(n_resamples):
+                rng.choice(control, len(control)).mean()
+                rng.choice(treatment, len(treatment)).mean()
+
+        timings = {}
+        for name, method in (('loop', loop), ('batched', lambda: bootstrap_lifts(control, treatment, n_resamples, 0))):
+            best = float('inf')
+            for _ in range(repeats):
+                start = time.perf_counter()
+                method()
+                best = min(best, time.perf_counter() - start)
+            timings[name] = best
+        result = resample_lift(control, treatment)
+
+        draws = f"{result['resamples']}+{result['permutations']}"
+        ci = f"{result['ci_low']:+.2f}..{result['ci_high']:+.2f}%"
+        print(f"   {n_trips:>12,}  {timings['loop']:>8.2f}  {timings['batched']:>10.2f}  {result['seconds']:>11.2f}  {draws:>11}  {ci:>18}")
+        del df
+
+SUITES = {
+    'ab': bench_ab,
+    'filter': bench_filter,
+    'formats': bench_formats,
+    'generation': bench_generation,
+    'resample': bench_resample,
+    'startup': bench_startup,
+    'streaming': bench_streaming,
+    'workers': bench_workers,
+}
+
+def main():
+    """Main benchmark function"""
+
+    parser = argparse.ArgumentParser(description='Benchmark the driver profitability data pipeline')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='Trip counts to benchmark (default: 1000 1000000 10000000)')
+    parser.add_argument('--suite', choices=sorted(SUITES), nargs='+', default=sorted(SUITES),
+                        help='Benchmarks to run (default: all)')
+
+    args = parser.parse_args()
+
+    print("🚗 Driver Profitability Dashboard - Benchmark")
+    print("=" * 50)
+
+    for suite in args.suite:
+        SUITES[suite](args.sizes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Shared Cache for the Driver Profitability Dashboard
+
+A process-wide, memory-capped LRU cache for derived datasets. One instance
+is shared by every Streamlit session, so each dataset version is built and
+held once no matter how many analysts are connected.
+"""
+
+import threading
+from collections import OrderedDict
+
+class SharedLRUCache:
+    """Thread-safe LRU cache bounded by the total size of its entries"""
+
+    def __init__(self, max_bytes, sizeof):
+        """
+        Args:
+            max_bytes (float): Total size above which least recently used
+                entries are evicted (the newest entry is always kept)
+            sizeof (callable): Returns the size in bytes of a cached value
+        """
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._n_bytes = 0
+        self._lock = threading.Lock()
+        self._build_locks = {}
+
+    def get(self, key, build):
+        """
+        Return the cached value for ``key``, building it on a miss
+
+        Concurrent misses on the same key build the value only once; the
+        other callers wait for it.
+
+        Args:
+            key: Hashable cache key
+            build (callable): Builds the value when it is not cached
+
+        Returns:
+            The cached value
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key][0]
+            try:
+                value = build()
+                size = self._sizeof(value)
+            except Exception:
+                # A failed build caches nothing; the next caller builds again
+                with self._lock:
+                    self._build_locks.pop(key, None)
+                raise
+            with self._lock:
+                self._entries[key] = (value, size)
+                self._n_bytes += size
+                self._build_locks.pop(key, None)
+                self._evict()
+        return value
+
+    def peek(self, key):
+        """
+        Return the cached value for ``key`` without building it
+
+        Args:
+            key: Hashable cache key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def _evict(self):
+        while self._n_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._n_bytes -= size
+
+    def stats(self):
+        """
+        Current cache occupancy
+
+        Returns:
+            dict: 'entries' and 'bytes' held
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._n_bytes}
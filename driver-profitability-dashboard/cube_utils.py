@@ -0,0 +1,172 @@
+"""
+Aggregate Cube for the Driver Profitability Dashboard
+
+Trips are rolled up once per dataset into cells keyed by every filter and
+grouping dimension the dashboard uses. Each cell keeps the count, sum and
+sum of squares of the dashboard's measures, so any mean, variance or
+filtered total can be answered by summing cells instead of scanning trips.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+# Dimensions a cell is keyed by; 'hour', 'weekday' and 'day' are the pickup
+# time dimensions (weekday follows from day, so it adds no cells)
+CUBE_DIMENSIONS = ['pickup_zone', 'driver_type', 'trip_bucket', 'ab_group', 'hour', 'weekday', 'day']
+
+# Measures aggregated in every cell
+CUBE_MEASURES = [
+    'net_earnings', 'driver_payout', 'trip_distance_km',
+    'gas_cost', 'time_cost', 'wait_cost', 'total_expenses',
+]
+
+# Measure pairs whose sum of products is kept per cell (covariances, e.g. for CUPED)
+CUBE_PRODUCTS = [('net_earnings', 'trip_distance_km')]
+
+def build_cube(df):
+    """
+    Roll trip data up into count/sum/sum-of-squares cells
+
+    Each dimension is factorized to integer codes, the codes are combined
+    into one cell number per trip, and every aggregate is a single
+    ``np.bincount`` over those cell numbers.
+
+    Args:
+        df (pd.DataFrame): Trip data with expenses, 'trip_bucket' and the
+            time dimensions from time_utils.add_time_dimensions
+
+    Returns:
+        pd.DataFrame: One row per non-empty cell, with the CUBE_DIMENSIONS
+            columns, a 'count' column, '<measure>_sum' / '<measure>_sumsq'
+            columns for each of CUBE_MEASURES and a '<a>_x_<b>_sum' column
+            for each pair in CUBE_PRODUCTS
+    """
+    codes, levels = [], []
+    for dim in CUBE_DIMENSIONS:
+        dim_codes, dim_levels = pd.factorize(df[dim], sort=True)
+        codes.append(dim_codes)
+        levels.append(dim_levels)
+
+    # Trips with a missing key (e.g. no trip bucket) belong to no cell
+    valid = np.logical_and.reduce([dim_codes >= 0 for dim_codes in codes])
+    shape = tuple(len(dim_levels) for dim_levels in levels)
+    cell_ids = np.ravel_multi_index([dim_codes[valid] for dim_codes in codes], shape)
+    n_cells = int(np.prod(shape))
+
+    counts = np.bincount(cell_ids, minlength=n_cells)
+    occupied = np.flatnonzero(counts)
+    cube = {
+        dim: dim_levels.take(dim_codes)
+        for dim, dim_levels, dim_codes in zip(CUBE_DIMENSIONS, levels, np.unravel_index(occupied, shape))
+    }
+    cube['count'] = counts[occupied]
+    # Keep only the measures still needed for products alive
+    paired = {measure for pair in CUBE_PRODUCTS for measure in pair}
+    kept = {}
+    for measure in CUBE_MEASURES:
+        values = df[measure].to_numpy(dtype=np.float64)[valid]
+        cube[f'{measure}_sum'] = np.bincount(cell_ids, weights=values, minlength=n_cells)[occupied]
+        cube[f'{measure}_sumsq'] = np.bincount(cell_ids, weights=values * values, minlength=n_cells)[occupied]
+        if measure in paired:
+            kept[measure] = values
+    for a, b in CUBE_PRODUCTS:
+        cube[f'{a}_x_{b}_sum'] = np.bincount(cell_ids, weights=kept[a] * kept[b], minlength=n_cells)[occupied]
+    return pd.DataFrame(cube)
+
+def slice_cube(cube, selections):
+    """
+    Keep only the cells matching a filter selection
+
+    Args:
+        cube (pd.DataFrame): Cube from build_cube
+        selections (dict): Dimension name -> allowed values
+
+    Returns:
+        pd.DataFrame: Matching cells
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    for dim, allowed in selections.items():
+        mask &= cube[dim].isin(allowed).to_numpy()
+    return cube[mask]
+
+def cube_summary(cells, by, measures, confidence=None):
+    """
+    Count, mean and standard deviation of several measures per group of cells
+
+    Every measure of every group comes from one grouped sum over the cells,
+    so any set of groups can be compared from the result.
+
+    Args:
+        cells (pd.DataFrame): Cube cells (usually from slice_cube)
+        by (str or list): Dimension(s) to group by
+        measures (list): Measures from CUBE_MEASURES
+        confidence (float): Coverage of normal-approximation confidence
+            intervals for the means; no interval columns when None
+
+    Returns:
+        pd.DataFrame: 'count' and '<measure>_mean' / '<measure>_std' columns
+            (plus '<measure>_ci_low' / '<measure>_ci_high' with
+            ``confidence``) indexed by group
+    """
+    columns = ['count'] + [f'{measure}_{stat}' for measure in measures for stat in ('sum', 'sumsq')]
+    totals = cells.groupby(by, observed=True)[columns].sum()
+    totals = totals[totals['count'] > 0]
+    n = totals['count']
+    summary = {'count': n}
+    for measure in measures:
+        mean = totals[f'{measure}_sum'] / n
+        var = ((totals[f'{measure}_sumsq'] - n * mean ** 2) / (n - 1)).where(n > 1).clip(lower=0)
+        summary[f'{measure}_mean'] = mean
+        summary[f'{measure}_std'] = np.sqrt(var)
+        if confidence is not None:
+            half_width = special.ndtri((1 + confidence) / 2) * np.sqrt(var / n)
+            summary[f'{measure}_ci_low'] = mean - half_width
+            summary[f'{measure}_ci_high'] = mean + half_width
+    return pd.DataFrame(summary)
+
+def cube_rollups(cells, groupings, measures):
+    """
+    Means of several measures for several groupings of cells, from one pass
+
+    The cells are summed once by every dimension any grouping uses; each
+    grouping is then rolled up from that small table instead of grouping
+    the cells again.
+
+    Args:
+        cells (pd.DataFrame): Cube cells (usually from slice_cube)
+        groupings (dict): Name -> dimension or list of dimensions
+        measures (list): Measures from CUBE_MEASURES
+
+    Returns:
+        dict: Name -> pd.DataFrame with 'count' and one mean column per
+            measure, indexed by group
+    """
+    keys = {name: [by] if isinstance(by, str) else list(by) for name, by in groupings.items()}
+    dims = list(dict.fromkeys(dim for by in keys.values() for dim in by))
+    sums = [f'{measure}_sum' for measure in measures]
+    totals = cells.groupby(dims, observed=True)[['count', *sums]].sum()
+    rollups = {}
+    for name, by in keys.items():
+        grouped = totals.groupby(level=by if len(by) > 1 else by[0], observed=True).sum()
+        grouped = grouped[grouped['count'] > 0]
+        means = grouped[sums].div(grouped['count'], axis=0)
+        means.columns = measures
+        means.insert(0, 'count', grouped['count'])
+        rollups[name] = means
+    return rollups
+
+def cube_total_means(cells, measures):
+    """
+    Means of several measures over all the given cells, from one pass
+
+    Args:
+        cells (pd.DataFrame): Cube cells (usually from slice_cube)
+        measures (list): Measures from CUBE_MEASURES
+
+    Returns:
+        pd.Series: Mean per measure (NaN when the cells hold no trips)
+    """
+    totals = cells[['count'] + [f'{measure}_sum' for measure in measures]].sum()
+    n = totals['count']
+    return pd.Series({measure: totals[f'{measure}_sum'] / n if n else float('nan') for measure in measures})
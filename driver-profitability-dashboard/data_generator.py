@@ -7,116 +7,427 @@ for further analysis or use in other tools.
 
 import pandas as pd
 import numpy as np
-import datetime
-from datetime import timedelta
 import argparse
+import os
+import glob
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-def generate_trip_data(n_trips=1000, output_file=None):
+from time_utils import pickup_hours
+
+# Zone characteristics, kept as parallel arrays so per-trip lookups are a
+# single fancy-index instead of a dict lookup per row
+ZONE_NAMES = np.array(['Downtown', 'Etobicoke', 'North York', 'Scarborough', 'Mississauga', 'Brampton'])
+ZONE_BASE_FARE = np.array([15, 12, 14, 13, 11, 10], dtype=np.float64)
+ZONE_DEMAND_FACTOR = np.array([1.2, 0.8, 1.0, 0.9, 0.7, 0.6])
+ZONE_SURGE_MULTIPLIER = np.array([1.3, 1.1, 1.2, 1.0, 0.9, 0.8])
+PICKUP_ZONE_P = [0.3, 0.15, 0.2, 0.15, 0.1, 0.1]
+DROPOFF_ZONE_P = [0.25, 0.2, 0.2, 0.15, 0.1, 0.1]
+
+# Driver segments and A/B groups, with their payout adjustments
+DRIVER_TYPES = np.array(['Full-time', 'Part-time'])
+DRIVER_TYPE_P = [0.6, 0.4]
+AB_GROUPS = np.array(['Control', 'Treatment'])
+FULL_TIME_PAYOUT_BONUS = 0.03
+TREATMENT_PAYOUT_BONUS = 0.05
+
+# Trips are spread across the week starting 2024-01-01 06:00
+BASE_TIME = np.datetime64('2024-01-01T06:00', 'm')
+BASE_HOUR = 6
+
+# Trips are drawn in blocks of this many rows, each from its own seeded
+# generator, so chunked output matches single-shot output row for row
+TRIP_BLOCK_SIZE = 100_000
+
+# Compact schema used for Parquet/Arrow output: fixed categories per column,
+# and integer widths for the numeric part of each ID
+CATEGORIES = {
+    'pickup_zone': list(ZONE_NAMES),
+    'dropoff_zone': list(ZONE_NAMES),
+    'driver_type': list(DRIVER_TYPES),
+    'ab_group': list(AB_GROUPS),
+}
+ID_PREFIXES = {
+    'trip_id': ('TRIP_', np.int32),
+    'driver_id': ('DRIVER_', np.int16),
+}
+TRIP_FILE_FORMATS = {
+    'csv': ('.csv',),
+    'parquet': ('.parquet', '.pq'),
+    'arrow': ('.arrow', '.feather', '.ipc'),
+}
+
+# Driver IDs come from a fixed pool, so they are formatted once and looked up
+DRIVER_ID_LOW, DRIVER_ID_HIGH = 1000, 9999
+DRIVER_IDS = np.array([f"DRIVER_{i}" for i in range(DRIVER_ID_LOW, DRIVER_ID_HIGH)], dtype=object)
+ZONE_LABELS = ZONE_NAMES.astype(object)
+DRIVER_TYPE_LABELS = DRIVER_TYPES.astype(object)
+AB_GROUP_LABELS = AB_GROUPS.astype(object)
+
+def _synthesize_trips(rng, first_trip, n_trips, id_width):
     """
-    Generate realistic trip data for analysis
+    Draw every trip column as a whole array from ``rng``
+
+    Args:
+        rng (np.random.Generator): Source of randomness
+        first_trip (int): Number of the first trip (used for trip IDs)
+        n_trips (int): Number of trips to draw
+        id_width (int): Digits used for trip IDs
+
+    Returns:
+        dict: Column name -> array, all aligned on a 0..n_trips-1 index
+    """
+    trip_numbers = pd.Series(np.arange(first_trip, first_trip + n_trips))
+    trip_ids = 'TRIP_' + trip_numbers.astype(str).str.zfill(id_width)
+    driver_ids = DRIVER_IDS[rng.integers(DRIVER_ID_LOW, DRIVER_ID_HIGH, n_trips) - DRIVER_ID_LOW]
+
+    # Zones are drawn as indices into the ZONE_* arrays
+    pickup_idx = rng.choice(len(ZONE_NAMES), n_trips, p=PICKUP_ZONE_P)
+    dropoff_idx = rng.choice(len(ZONE_NAMES), n_trips, p=DROPOFF_ZONE_P)
+
+    # Generate trip characteristics
+    trip_distances = rng.exponential(8, n_trips) + 1  # 1-30 km range
+    trip_durations = trip_distances * rng.uniform(2, 4, n_trips)  # 2-4 min per km
+
+    # Timestamps across a week, as minute offsets from BASE_TIME
+    days = rng.integers(0, 7, n_trips)
+    hours = rng.integers(0, 24, n_trips)
+    minutes = rng.integers(0, 60, n_trips)
+    offsets = (days * 1440 + hours * 60 + minutes).astype('timedelta64[m]')
+    pickup_times = (BASE_TIME + offsets).astype('datetime64[ns]')
+
+    # Fare: zone base fare + $1.50 per km + $0.30 per minute, scaled by the
+    # zone's surge multiplier, +/-10% variability
+    total_fare = ZONE_BASE_FARE[pickup_idx] + trip_distances * 1.5 + trip_durations * 0.3
+    total_fare *= ZONE_SURGE_MULTIPLIER[pickup_idx]
+    total_fare *= rng.uniform(0.9, 1.1, n_trips)
+
+    # Driver payout (typically 70-80% of fare, more for full-time and treatment drivers)
+    driver_type_idx = rng.choice(len(DRIVER_TYPES), n_trips, p=DRIVER_TYPE_P)
+    ab_group_idx = (rng.random(n_trips) < 0.5).astype(np.intp)
+    payout_multiplier = rng.uniform(0.7, 0.8, n_trips)
+    payout_multiplier += np.where(driver_type_idx == 0, FULL_TIME_PAYOUT_BONUS, 0.0)
+    payout_multiplier += np.where(ab_group_idx == 1, TREATMENT_PAYOUT_BONUS, 0.0)
+    driver_payouts = total_fare * payout_multiplier
+
+    # Higher wait times during off-peak hours and low-demand zones
+    pickup_hour = (BASE_HOUR + hours) % 24
+    time_factor = np.where((pickup_hour < 6) | (pickup_hour > 22), 1.5, 1.0)
+    zone_factor = np.where(ZONE_DEMAND_FACTOR[pickup_idx] < 0.9, 1.5, 1.0)
+    wait_times = rng.exponential(3, n_trips) * time_factor * zone_factor
+
+    # Generate cancellations (rare)
+    cancellations = rng.random(n_trips) < 0.05
+
+    return {
+        'trip_id': trip_ids,
+        'driver_id': driver_ids,
+        'pickup_zone': ZONE_LABELS[pickup_idx],
+        'dropoff_zone': ZONE_LABELS[dropoff_idx],
+        'trip_distance_km': trip_distances,
+        'trip_duration_min': trip_durations,
+        'pickup_time': pickup_times,
+        'fare_amount': np.round(total_fare, 2),
+        'driver_payout': np.round(driver_payouts, 2),
+        'wait_time_min': np.round(wait_times, 1),
+        'cancellation': cancellations,
+        'driver_type': DRIVER_TYPE_LABELS[driver_type_idx],
+        'ab_group': AB_GROUP_LABELS[ab_group_idx]
+    }
+
+def _id_width(n_trips):
+    """Digits used for trip IDs, fixed per dataset so every chunk agrees"""
+    return max(6, len(str(n_trips)))
+
+def _n_blocks(n_trips):
+    """Number of TRIP_BLOCK_SIZE blocks needed to cover ``n_trips``"""
+    return -(-n_trips // TRIP_BLOCK_SIZE)
+
+def _generate_block(block, n_trips, seed):
+    """
+    Generate one fixed-size block of trips
+    
+    Block ``k`` always covers trips ``k * TRIP_BLOCK_SIZE`` onwards and draws
+    from its own generator derived from ``seed``, so a block's contents do
+    not depend on how the rest of the dataset is produced.
     
     Args:
-        n_trips (int): Number of trips to generate
-        output_file (str): Optional CSV file path to save data
+        block (int): Block number
+        n_trips (int): Total number of trips in the dataset
+        seed (int): Dataset seed
     
     Returns:
-        pd.DataFrame: Generated trip data
+        pd.DataFrame: Trip data for the block, indexed by trip position
     """
+    start = block * TRIP_BLOCK_SIZE
+    stop = min(start + TRIP_BLOCK_SIZE, n_trips)
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block,)))
+    df = pd.DataFrame(_synthesize_trips(rng, start + 1, stop - start, _id_width(n_trips)))
+    df.index = pd.RangeIndex(start, stop)
+    return calculate_driver_expenses(df)
+
+def to_compact_frame(df):
+    """
+    Convert trip data to the compact columnar schema
     
-    # Define zones and their characteristics
-    zones = {
-        'Downtown': {'base_fare': 15, 'demand_factor': 1.2},
-        'Etobicoke': {'base_fare': 12, 'demand_factor': 0.8},
-        'North York': {'base_fare': 14, 'demand_factor': 1.0},
-        'Scarborough': {'base_fare': 13, 'demand_factor': 0.9},
-        'Mississauga': {'base_fare': 11, 'demand_factor': 0.7},
-        'Brampton': {'base_fare': 10, 'demand_factor': 0.6}
-    }
+    Zone, driver type and A/B group become categoricals with fixed
+    categories (so every chunk and part file shares one dictionary), trip and
+    driver IDs become their integer numbers, and float columns become float32.
     
-    # Generate trip data
-    np.random.seed(42)
+    Args:
+        df (pd.DataFrame): Trip data in the generator's schema
     
-    trip_ids = [f"TRIP_{i:06d}" for i in range(1, n_trips + 1)]
-    driver_ids = [f"DRIVER_{np.random.randint(1000, 9999)}" for _ in range(n_trips)]
+    Returns:
+        pd.DataFrame: Trip data in the compact schema
+    """
+    compact = {}
+    for col in df.columns:
+        values = df[col]
+        if col in CATEGORIES:
+            compact[col] = pd.Categorical(values, categories=CATEGORIES[col])
+        elif col in ID_PREFIXES:
+            if not pd.api.types.is_integer_dtype(values):
+                values = values.str.slice(len(ID_PREFIXES[col][0])).astype(np.int64)
+            compact[col] = values.astype(ID_PREFIXES[col][1])
+        elif col == 'pickup_time':
+            compact[col] = pd.to_datetime(values).astype('datetime64[ns]')
+        elif pd.api.types.is_float_dtype(values):
+            compact[col] = values.astype(np.float32)
+        else:
+            compact[col] = values
+    return pd.DataFrame(compact, index=df.index)
+
+def trip_file_format(path):
+    """
+    Infer the trip file format from a path's extension
     
-    # Generate pickup and dropoff zones
-    pickup_zones = np.random.choice(list(zones.keys()), n_trips, p=[0.3, 0.15, 0.2, 0.15, 0.1, 0.1])
-    dropoff_zones = np.random.choice(list(zones.keys()), n_trips, p=[0.25, 0.2, 0.2, 0.15, 0.1, 0.1])
+    Args:
+        path (str): File path
     
-    # Generate trip characteristics
-    trip_distances = np.random.exponential(8, n_trips) + 1  # 1-30 km range
-    trip_durations = trip_distances * np.random.uniform(2, 4, n_trips)  # 2-4 min per km
-    
-    # Generate timestamps across a week
-    base_time = datetime.datetime(2024, 1, 1, 6, 0, 0)
-    pickup_times = [base_time + timedelta(
-        days=np.random.randint(0, 7),
-        hours=np.random.randint(0, 24),
-        minutes=np.random.randint(0, 60)
-    ) for _ in range(n_trips)]
-    
-    # Calculate fares based on zones and distance
-    fare_amounts = []
-    driver_payouts = []
-    
-    for i in range(n_trips):
-        pickup_zone = pickup_zones[i]
-        distance = trip_distances[i]
-        duration = trip_durations[i]
-        
-        # Base fare calculation
-        base_fare = zones[pickup_zone]['base_fare']
-        distance_fare = distance * 1.5  # $1.50 per km
-        time_fare = duration * 0.3  # $0.30 per minute
-        
-        total_fare = base_fare + distance_fare + time_fare
-        total_fare *= np.random.uniform(0.9, 1.1)  # Add some variability
-        
-        # Driver payout (typically 70-80% of fare)
-        driver_payout = total_fare * np.random.uniform(0.7, 0.8)
-        
-        fare_amounts.append(round(total_fare, 2))
-        driver_payouts.append(round(driver_payout, 2))
-    
-    # Generate wait times (higher during low demand periods)
-    wait_times = []
-    for i in range(n_trips):
-        hour = pickup_times[i].hour
-        zone = pickup_zones[i]
-        demand_factor = zones[zone]['demand_factor']
-        
-        # Higher wait times during off-peak hours and low-demand zones
-        base_wait = np.random.exponential(3)
-        time_factor = 1.5 if hour < 6 or hour > 22 else 1.0
-        zone_factor = 1.5 if demand_factor < 0.9 else 1.0
-        
-        wait_time = base_wait * time_factor * zone_factor
-        wait_times.append(round(wait_time, 1))
+    Returns:
+        str: One of TRIP_FILE_FORMATS
+    """
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, extensions in TRIP_FILE_FORMATS.items():
+        if ext in extensions:
+            return fmt
+    raise ValueError(f"Unsupported trip file extension '{ext}'; use one of "
+                     f"{', '.join(e for exts in TRIP_FILE_FORMATS.values() for e in exts)}")
+
+class _TripFileWriter:
+    """Append trip chunks to a CSV, Parquet or Arrow IPC file with a fixed schema"""
+
+    def __init__(self, path, fmt=None):
+        self.path = path
+        self.fmt = fmt or trip_file_format(path)
+        self.n_written = 0
+        self._writer = None
+
+    def write(self, chunk):
+        if self.fmt == 'csv':
+            chunk.to_csv(self.path, mode='w' if self.n_written == 0 else 'a', header=self.n_written == 0, index=False)
+        else:
+            table = pa.Table.from_pandas(to_compact_frame(chunk), preserve_index=False)
+            if self._writer is None:
+                if self.fmt == 'parquet':
+                    self._writer = pq.ParquetWriter(self.path, table.schema)
+                else:
+                    self._writer = pa.ipc.new_file(self.path, table.schema)
+            self._writer.write_table(table)
+        self.n_written += len(chunk)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+def write_trip_file(df, path, fmt=None):
+    """
+    Write trip data to CSV, or to Parquet/Arrow IPC in the compact schema
     
-    # Generate cancellations (rare)
-    cancellations = np.random.choice([True, False], n_trips, p=[0.05, 0.95])
+    Args:
+        df (pd.DataFrame): Trip data
+        path (str): Output file path
+        fmt (str): File format; inferred from the extension if omitted
+    """
+    write_trip_chunks([df], path, fmt)
+
+def load_trip_file(path, columns=None):
+    """
+    Load trip data written by this module
     
-    # Create DataFrame
-    df = pd.DataFrame({
-        'trip_id': trip_ids,
-        'driver_id': driver_ids,
-        'pickup_zone': pickup_zones,
-        'dropoff_zone': dropoff_zones,
-        'trip_distance_km': trip_distances,
-        'trip_duration_min': trip_durations,
-        'pickup_time': pickup_times,
-        'fare_amount': fare_amounts,
-        'driver_payout': driver_payouts,
-        'wait_time_min': wait_times,
-        'cancellation': cancellations
-    })
+    Arrow IPC files are memory-mapped and Parquet files are read through a
+    memory map, so numeric columns are not copied through Python. CSV files
+    and directories of part files are also accepted; everything is returned in
+    the compact schema.
+    
+    Args:
+        path (str): Trip file, or directory of ``part-*`` files
+        columns (list): Optional subset of columns to load
+    
+    Returns:
+        pd.DataFrame: Trip data in the compact schema
+    """
+    if os.path.isdir(path):
+        parts = sorted(glob.glob(os.path.join(path, 'part-*')))
+        if not parts:
+            raise FileNotFoundError(f"No part files found in {path}")
+        return pd.concat([load_trip_file(part, columns) for part in parts], ignore_index=True)
+    
+    fmt = trip_file_format(path)
+    if fmt == 'csv':
+        df = pd.read_csv(path, usecols=columns, parse_dates=['pickup_time'] if columns is None or 'pickup_time' in columns else None)
+        return to_compact_frame(df)
+    if fmt == 'parquet':
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        if columns is not None:
+            table = table.select(columns)
+    return table.to_pandas(split_blocks=True)
+
+def _iter_blocks(n_trips, seed, workers=1):
+    """
+    Yield the dataset's blocks in order, optionally generated by a process pool
+    
+    At most ``2 * workers`` blocks are in flight at once, so a slow consumer
+    does not make finished blocks pile up in memory.
+    
+    Args:
+        n_trips (int): Total number of trips in the dataset
+        seed (int): Dataset seed
+        workers (int): Number of worker processes (1 generates in-process)
+    
+    Yields:
+        pd.DataFrame: Blocks in trip order
+    """
+    blocks = range(_n_blocks(n_trips))
+    if workers <= 1:
+        for block in blocks:
+            yield _generate_block(block, n_trips, seed)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for block in blocks:
+            in_flight.append(pool.submit(_generate_block, block, n_trips, seed))
+            if len(in_flight) >= 2 * workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+
+def iter_trip_chunks(n_trips=1000, chunk_size=TRIP_BLOCK_SIZE, seed=42, workers=1):
+    """
+    Generate trip data as a stream of fixed-size chunks
+    
+    Only the chunk being assembled and one block are held in memory, so peak
+    memory does not grow with ``n_trips``. Concatenating the chunks gives
+    exactly the frame ``generate_trip_data`` returns for the same seed.
+    
+    Args:
+        n_trips (int): Number of trips to generate
+        chunk_size (int): Number of trips per yielded chunk (the last may be shorter)
+        seed (int): Seed for the random generator; same seed, same data
+        workers (int): Number of worker processes generating blocks
+    
+    Yields:
+        pd.DataFrame: Consecutive chunks of trip data
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    
+    pending = None
+    for frame in _iter_blocks(n_trips, seed, workers):
+        pending = frame if pending is None else pd.concat([pending, frame])
+        while len(pending) >= chunk_size:
+            yield pending.iloc[:chunk_size]
+            pending = pending.iloc[chunk_size:]
+    
+    if pending is not None and len(pending):
+        yield pending
+
+def write_trip_chunks(chunks, output_file, fmt=None):
+    """
+    Append a stream of trip chunks to a single output file
     
-    # Calculate additional metrics
-    df = calculate_driver_expenses(df)
+    CSV output writes the header once; Parquet and Arrow IPC output use the
+    compact schema, one row group or record batch per chunk.
     
-    # Save to CSV if output file specified
+    Args:
+        chunks (iterable): DataFrames to write, in order
+        output_file (str): Output file path
+        fmt (str): File format; inferred from the extension if omitted
+    
+    Returns:
+        int: Number of trips written
+    """
+    writer = _TripFileWriter(output_file, fmt)
+    try:
+        for chunk in chunks:
+            writer.write(chunk)
+    finally:
+        writer.close()
+    return writer.n_written
+
+def _write_block_part(block, n_trips, seed, output_dir, fmt):
+    """Generate one block and write it to its own part file (runs in a worker)"""
+    path = os.path.join(output_dir, f"part-{block:05d}{TRIP_FILE_FORMATS[fmt][0]}")
+    write_trip_file(_generate_block(block, n_trips, seed), path, fmt)
+    return path
+
+def write_trip_parts(n_trips, output_dir, seed=42, workers=1, fmt='csv'):
+    """
+    Generate trip data straight into one part file per block
+    
+    Each worker generates and writes its own blocks, so no trip data crosses
+    process boundaries. Reading the parts in name order gives the same rows as
+    ``generate_trip_data`` for the same seed, whatever the number of workers.
+    
+    Args:
+        n_trips (int): Number of trips to generate
+        output_dir (str): Directory to write ``part-NNNNN`` files into
+        seed (int): Seed for the random generator; same seed, same data
+        workers (int): Number of worker processes
+        fmt (str): Part file format, one of TRIP_FILE_FORMATS
+    
+    Returns:
+        list: Part file paths, in trip order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    write_part = partial(_write_block_part, n_trips=n_trips, seed=seed, output_dir=output_dir, fmt=fmt)
+    blocks = range(_n_blocks(n_trips))
+    if workers <= 1:
+        return [write_part(block) for block in blocks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(write_part, blocks))
+
+def generate_trip_data(n_trips=1000, output_file=None, seed=42, workers=1):
+    """
+    Generate realistic trip data for analysis
+    
+    Every column is drawn as a whole NumPy array, so the cost per trip is a
+    handful of vector operations rather than a Python loop iteration.
+    
+    Args:
+        n_trips (int): Number of trips to generate
+        output_file (str): Optional file path to save data (.csv, .parquet or .arrow)
+        seed (int): Seed for the random generator; same seed, same data
+        workers (int): Number of worker processes; the result does not depend on it
+    
+    Returns:
+        pd.DataFrame: Generated trip data
+    """
+    
+    # Always build at least one (possibly empty) block so the schema is kept
+    blocks = list(_iter_blocks(n_trips, seed, workers)) or [_generate_block(0, n_trips, seed)]
+    df = pd.concat(blocks) if len(blocks) > 1 else blocks[0]
+    
+    # Save to file if output file specified
     if output_file:
-        df.to_csv(output_file, index=False)
+        write_trip_file(df, output_file)
         print(f"Data saved to {output_file}")
     
     return df
@@ -174,8 +485,9 @@ def print_summary_stats(df):
     for zone, earnings in zone_earnings.items():
         print(f"   {zone}: ${earnings:.2f}")
     
-    print(f"\n🕐 Best Hour: {df.groupby(df['pickup_time'].dt.hour)['net_earnings'].mean().idxmax()}:00")
-    print(f"🕐 Worst Hour: {df.groupby(df['pickup_time'].dt.hour)['net_earnings'].mean().idxmin()}:00")
+    hourly = df['net_earnings'].groupby(pickup_hours(df['pickup_time'])).mean()
+    print(f"\n🕐 Best Hour: {hourly.idxmax()}:00")
+    print(f"🕐 Worst Hour: {hourly.idxmin()}:00")
     
     print(f"\n🚗 Trip Distance Analysis:")
     df['trip_type'] = pd.cut(df['trip_distance_km'], bins=[0, 5, 10, float('inf')], labels=['Short', 'Medium', 'Long'])
@@ -190,15 +502,43 @@ def main():
     
     parser = argparse.ArgumentParser(description='Generate trip data for driver profitability analysis')
     parser.add_argument('--trips', type=int, default=1000, help='Number of trips to generate (default: 1000)')
-    parser.add_argument('--output', type=str, help='Output CSV file path (optional)')
+    parser.add_argument('--output', type=str, help='Output file path: .csv, .parquet or .arrow (optional)')
     parser.add_argument('--summary', action='store_true', help='Print summary statistics')
+    parser.add_argument('--chunk-size', type=int, help='Stream trips to --output in chunks of this size (bounded memory)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes (default: 1)')
+    parser.add_argument('--parts', action='store_true', help='Write one part file per shard into the --output directory')
+    parser.add_argument('--format', choices=sorted(TRIP_FILE_FORMATS), help='Output format (default: from --output extension, csv for --parts)')
     
     args = parser.parse_args()
     
+    if (args.chunk_size or args.parts) and not args.output:
+        parser.error('--chunk-size and --parts require --output')
+    
     print(f"Generating {args.trips:,} trip records...")
     
+    # Part-file mode: each worker writes its own shards
+    if args.parts:
+        parts = write_trip_parts(args.trips, args.output, args.seed, args.workers, args.format or 'csv')
+        print(f"Data saved to {len(parts)} part file(s) in {args.output}")
+        print(f"\n✅ Generated {args.trips:,} trip records successfully!")
+        return
+    
+    # Streaming mode: write each chunk as it is generated
+    if args.chunk_size:
+        if args.summary:
+            print("⚠️  --summary is not available with --chunk-size; skipping")
+        n_written = write_trip_chunks(
+            iter_trip_chunks(args.trips, args.chunk_size, args.seed, args.workers), args.output, args.format)
+        print(f"Data saved to {args.output}")
+        print(f"\n✅ Generated {n_written:,} trip records successfully!")
+        return
+    
     # Generate data
-    df = generate_trip_data(args.trips, args.output)
+    df = generate_trip_data(args.trips, seed=args.seed, workers=args.workers)
+    if args.output:
+        write_trip_file(df, args.output, args.format)
+        print(f"Data saved to {args.output}")
     
     # Print summary if requested
     if args.summary:
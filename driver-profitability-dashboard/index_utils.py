@@ -0,0 +1,65 @@
+"""
+Bitmap Index for the Driver Profitability Dashboard
+
+For each filter dimension the index keeps one packed bitmap (one bit per
+trip) per distinct value. A sidebar selection is then evaluated as an OR of
+the selected values' bitmaps within each dimension and an AND across
+dimensions, without rescanning the underlying string columns.
+"""
+
+import numpy as np
+import pandas as pd
+
+class BitmapIndex:
+    """Packed per-value bitmaps over a fixed set of trip columns"""
+
+    def __init__(self, df, dimensions):
+        """
+        Build the bitmaps; done once per dataset
+
+        Args:
+            df (pd.DataFrame): Trip data
+            dimensions (list): Columns to index
+        """
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        for dim in dimensions:
+            codes, values = pd.factorize(df[dim], sort=True)
+            self.bitmaps[dim] = {
+                value: np.packbits(codes == code)
+                for code, value in enumerate(values)
+            }
+        self._all = np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def select(self, selections):
+        """
+        Evaluate a filter selection to a packed bitmap
+
+        Args:
+            selections (dict): Dimension name -> allowed values; values that
+                do not occur in the data are ignored
+
+        Returns:
+            np.ndarray: Packed bitmap (uint8) of matching rows
+        """
+        result = self._all.copy()
+        for dim, allowed in selections.items():
+            dim_bits = np.zeros_like(result)
+            for value in allowed:
+                bits = self.bitmaps[dim].get(value)
+                if bits is not None:
+                    np.bitwise_or(dim_bits, bits, out=dim_bits)
+            np.bitwise_and(result, dim_bits, out=result)
+        return result
+
+    def positions(self, selections):
+        """
+        Row positions matching a filter selection
+
+        Args:
+            selections (dict): Dimension name -> allowed values
+
+        Returns:
+            np.ndarray: Sorted integer positions, usable with ``df.iloc``
+        """
+        return np.flatnonzero(np.unpackbits(self.select(selections), count=self.n_rows))
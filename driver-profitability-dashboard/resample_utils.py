@@ -0,0 +1,236 @@
+"""
+Resampling Engine for the Driver Profitability Dashboard
+
+Bootstrap confidence intervals and permutation p-values for the A/B lift.
+Net earnings are skewed (unprofitable trips are strongly negative), so these
+complement the t-test's normal approximation. Resamples are drawn as
+batched index matrices, spread over a shared process pool in rounds, and
+stop early once the interval and the p-value are precise enough.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+# Upper bound on entries per batched matrix (8 bytes each). Kept small enough
+# that the allocator reuses the memory between calls instead of mapping and
+# paging in fresh matrices every time, which was 15x slower at 4M entries
+RESAMPLE_BATCH_CELLS = 1_000_000
+
+# Resamples each worker draws per round
+RESAMPLE_ROUND = 100
+
+# Resamples always drawn before checking convergence, and the most ever drawn
+MIN_RESAMPLES = 400
+MAX_RESAMPLES = 5_000
+
+# Converged once the CI width changes by less than this share between rounds
+CI_TOLERANCE = 0.02
+
+# Converged once the permutation p-value's standard error is below this
+# share of the p-value ...
+P_TOLERANCE = 0.1
+
+# ... or once the p-value is this many standard errors from the significance
+# level, so the test's verdict can no longer change
+P_DECISION_Z = 3
+
+# Processes drawing resamples; one draws in-process
+RESAMPLE_WORKERS = os.cpu_count() or 1
+
+_resample_pool = None
+_resample_pool_lock = threading.Lock()
+
+def resample_pool():
+    """
+    Process pool shared by every resampling run, started on first use
+
+    Returns:
+        ProcessPoolExecutor: RESAMPLE_WORKERS resampling processes
+    """
+    global _resample_pool
+    with _resample_pool_lock:
+        if _resample_pool is None:
+            # Spawn rather than fork: the Streamlit server is multi-threaded
+            _resample_pool = ProcessPoolExecutor(max_workers=RESAMPLE_WORKERS,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return _resample_pool
+
+def _reset_resample_pool(pool):
+    global _resample_pool
+    with _resample_pool_lock:
+        if _resample_pool is pool:
+            _resample_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _batch_rows(n_values, n_draws):
+    """Rows per index matrix so a matrix holds at most RESAMPLE_BATCH_CELLS entries"""
+    return max(1, min(n_draws, RESAMPLE_BATCH_CELLS // max(n_values, 1)))
+
+def _bootstrap_means(rng, values, n_resamples):
+    n = len(values)
+    rows = _batch_rows(n, n_resamples)
+    # Matrices are allocated once and refilled: fresh large arrays would be
+    # paged in again for every batch
+    uniform = np.empty((rows, n))
+    index = np.empty((rows, n), dtype=np.intp)
+    drawn = np.empty((rows, n))
+    means = np.empty(n_resamples)
+    for start in range(0, n_resamples, rows):
+        batch = min(rows, n_resamples - start)
+        rng.random(out=uniform[:batch])
+        uniform[:batch] *= n
+        index[:batch] = uniform[:batch]  # truncates to 0..n-1
+        # mode='clip' skips the bounds check that makes take() buffer its output
+        np.take(values, index[:batch], out=drawn[:batch], mode='clip')
+        means[start:start + batch] = drawn[:batch].mean(axis=1)
+    return means
+
+def bootstrap_lifts(control, treatment, n_resamples, seed):
+    """
+    Lift (% of the control mean) of bootstrap resamples of both groups
+
+    Args:
+        control (np.ndarray): Control group values
+        treatment (np.ndarray): Treatment group values
+        n_resamples (int): Resamples to draw
+        seed: Seed or np.random.SeedSequence
+
+    Returns:
+        np.ndarray: One lift per resample
+    """
+    rng = np.random.default_rng(seed)
+    mean_c = _bootstrap_means(rng, control, n_resamples)
+    mean_t = _bootstrap_means(rng, treatment, n_resamples)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (mean_t - mean_c) / mean_c * 100
+
+def permutation_diffs(control, treatment, n_permutations, seed):
+    """
+    Difference in means (treatment - control) after randomly relabelling the groups
+
+    Args:
+        control (np.ndarray): Control group values
+        treatment (np.ndarray): Treatment group values
+        n_permutations (int): Permutations to draw
+        seed: Seed or np.random.SeedSequence
+
+    Returns:
+        np.ndarray: One difference per permutation
+    """
+    rng = np.random.default_rng(seed)
+    pooled = np.concatenate([treatment, control])
+    total = pooled.sum()
+    n_t, n_c = len(treatment), len(control)
+    rows = _batch_rows(len(pooled), n_permutations)
+    shuffled = np.empty((rows, len(pooled)))
+    diffs = np.empty(n_permutations)
+    for start in range(0, n_permutations, rows):
+        batch = min(rows, n_permutations - start)
+        shuffled[:batch] = pooled
+        rng.permuted(shuffled[:batch], axis=1, out=shuffled[:batch])
+        treat_sum = shuffled[:batch, :n_t].sum(axis=1)
+        diffs[start:start + batch] = treat_sum / n_t - (total - treat_sum) / n_c
+    return diffs
+
+def _resample_task(kind, control, treatment, n_draws, seed):
+    draw = bootstrap_lifts if kind == 'bootstrap' else permutation_diffs
+    return kind, draw(control, treatment, n_draws, seed)
+
+def _run_round(tasks, workers):
+    if workers <= 1:
+        return [_resample_task(*task) for task in tasks]
+    pool = resample_pool()
+    try:
+        futures = [pool.submit(_resample_task, *task) for task in tasks]
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        # A resampling process died; the next round starts a fresh pool
+        _reset_resample_pool(pool)
+        raise
+
+def resample_lift(control, treatment, confidence=0.95, workers=RESAMPLE_WORKERS, seed=0):
+    """
+    Bootstrap CI of the lift and permutation p-value of the mean difference
+
+    Each round draws RESAMPLE_ROUND resamples per worker for whichever of
+    the two is still unsettled. The bootstrap settles once the CI width
+    changes by less than CI_TOLERANCE between rounds. The permutation test
+    settles once its p-value's standard error is below P_TOLERANCE of the
+    p-value, or the p-value is P_DECISION_Z standard errors away from the
+    significance level (1 - confidence). Both stop after MAX_RESAMPLES.
+    Seeds are spawned per task, so results are reproducible for a given
+    seed and worker count.
+
+    Args:
+        control (array-like): Control group values
+        treatment (array-like): Treatment group values
+        confidence (float): CI coverage and 1 - significance level
+        workers (int): Tasks per round, drawn on the shared process pool;
+            1 draws in-process
+        seed (int): Seed for all resampling
+
+    Returns:
+        dict: 'lift', 'ci_low', 'ci_high', 'p' (two-sided permutation
+            p-value), 'resamples', 'permutations', 'bootstrap_converged' and
+            'permutation_converged' (False when MAX_RESAMPLES was reached
+            first), and 'seconds'
+    """
+    start = time.perf_counter()
+    control = np.asarray(control, dtype=np.float64)
+    treatment = np.asarray(treatment, dtype=np.float64)
+    if len(control) < 2 or len(treatment) < 2:
+        raise ValueError("both groups need at least two values")
+    lift = (treatment.mean() - control.mean()) / control.mean() * 100
+    observed = abs(treatment.mean() - control.mean())
+    alpha = (1 - confidence) / 2
+
+    seeds = np.random.SeedSequence(seed)
+    lifts, diffs = [], []
+    n_lifts = n_diffs = 0
+    width = None
+    bootstrap_converged = permutation_converged = False
+    bootstrap_done = permutation_done = False
+
+    while not (bootstrap_done and permutation_done):
+        tasks = []
+        for kind, done in (('bootstrap', bootstrap_done), ('permutation', permutation_done)):
+            if not done:
+                tasks += [(kind, control, treatment, RESAMPLE_ROUND, task_seed)
+                          for task_seed in seeds.spawn(workers)]
+        for kind, draws in _run_round(tasks, workers):
+            (lifts if kind == 'bootstrap' else diffs).append(draws)
+
+        if not bootstrap_done:
+            n_lifts = sum(map(len, lifts))
+            low, high = np.nanquantile(np.concatenate(lifts), [alpha, 1 - alpha])
+            previous, width = width, high - low
+            bootstrap_converged = (n_lifts >= MIN_RESAMPLES and previous is not None
+                                   and abs(width - previous) <= CI_TOLERANCE * abs(previous))
+            bootstrap_done = bootstrap_converged or n_lifts >= MAX_RESAMPLES
+        if not permutation_done:
+            all_diffs = np.concatenate(diffs)
+            n_diffs = len(all_diffs)
+            # Add-one estimate, so the p-value is never exactly 0
+            p = (np.count_nonzero(np.abs(all_diffs) >= observed) + 1) / (n_diffs + 1)
+            p_se = np.sqrt(p * (1 - p) / n_diffs)
+            permutation_converged = n_diffs >= MIN_RESAMPLES and (
+                p_se < P_TOLERANCE * p or abs(p - (1 - confidence)) > P_DECISION_Z * p_se)
+            permutation_done = permutation_converged or n_diffs >= MAX_RESAMPLES
+
+    return {
+        'lift': lift,
+        'ci_low': low,
+        'ci_high': high,
+        'p': p,
+        'resamples': n_lifts,
+        'permutations': n_diffs,
+        'bootstrap_converged': bool(bootstrap_converged),
+        'permutation_converged': bool(permutation_converged),
+        'seconds': time.perf_counter() - start,
+    }
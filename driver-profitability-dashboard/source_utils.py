@@ -0,0 +1,116 @@
+"""
+Data Source Layer for the Driver Profitability Dashboard
+
+Resolves where the dashboard's trips come from: a CSV, Parquet or Arrow
+file, a directory of part files written by data_generator.py, or a freshly
+simulated dataset when no source is given. Only the columns the dashboard
+uses are loaded, in the compact categorical/float32 schema.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_generator import generate_trip_data, load_trip_file, to_compact_frame, calculate_driver_expenses
+from time_utils import add_time_dimensions, sort_by_time
+
+# Columns the dashboard reads; expenses are derived from these on load
+DASHBOARD_COLUMNS = [
+    'pickup_zone', 'driver_type', 'ab_group', 'pickup_time',
+    'trip_distance_km', 'trip_duration_min', 'wait_time_min', 'driver_payout',
+]
+
+# Trips simulated when no data source is configured
+DEFAULT_TRIPS = 1000
+
+# Share of trips turned unprofitable to model bad trips (tolls, detours, ...)
+UNPROFITABLE_SHARE = 0.02
+
+# Default memory cap for the shared dataset cache
+DEFAULT_CACHE_MB = 2048
+
+def parse_source_args(argv):
+    """
+    Read the dashboard's own command-line options
+
+    Streamlit passes arguments after ``--`` through to the script, e.g.
+    ``streamlit run app.py -- --data trips.parquet``.
+
+    Args:
+        argv (list): Arguments after the script name
+
+    Returns:
+        argparse.Namespace: Options with 'data' (path or None) and 'cache_mb' attributes
+    """
+    parser = argparse.ArgumentParser(description='Driver Profitability Dashboard')
+    parser.add_argument('--data', type=str, help='Trip file (.csv, .parquet, .arrow) or directory of part files')
+    parser.add_argument('--cache-mb', type=float, default=DEFAULT_CACHE_MB,
+                        help=f'Memory cap for datasets shared across sessions (default: {DEFAULT_CACHE_MB})')
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+def source_version(path):
+    """
+    Modification time of a data source, used to invalidate cached loads
+
+    Args:
+        path (str): Trip file or directory, or None for simulated data
+
+    Returns:
+        float: Latest modification time, or None for simulated data
+    """
+    if not path:
+        return None
+    if os.path.isdir(path):
+        entries = [os.path.join(path, name) for name in os.listdir(path)]
+        return max([os.path.getmtime(path)] + [os.path.getmtime(entry) for entry in entries])
+    return os.path.getmtime(path)
+
+def load_trips(path=None, n_trips=DEFAULT_TRIPS):
+    """
+    Load the dashboard's trip columns from a data source
+
+    Args:
+        path (str): Trip file or directory; simulate trips when None
+        n_trips (int): Number of trips to simulate when no path is given
+
+    Returns:
+        pd.DataFrame: DASHBOARD_COLUMNS in the compact schema
+    """
+    if path:
+        return load_trip_file(path, columns=DASHBOARD_COLUMNS)
+    return to_compact_frame(generate_trip_data(n_trips)[DASHBOARD_COLUMNS])
+
+def derive_trip_frame(trips, seed=42):
+    """
+    Add the dashboard's derived columns to loaded trips
+
+    Computes expenses and net earnings, turns a seeded UNPROFITABLE_SHARE of
+    trips unprofitable, adds 'trip_bucket' and the integer time dimensions
+    (pickup 'hour', 'weekday' and 'day'), and sorts the trips by pickup
+    time. The input frame is not modified, and the same trips and seed
+    always give the same result.
+
+    Args:
+        trips (pd.DataFrame): DASHBOARD_COLUMNS, as returned by load_trips
+        seed (int): Seed for choosing the unprofitable trips
+
+    Returns:
+        pd.DataFrame: New frame with the derived columns
+    """
+    df = calculate_driver_expenses(trips.copy())
+
+    if len(df):
+        rng = np.random.default_rng(seed)
+        n_unprofitable = max(1, int(UNPROFITABLE_SHARE * len(df)))
+        positions = rng.choice(len(df), n_unprofitable, replace=False)
+        net_earnings = df['net_earnings'].to_numpy(copy=True)
+        net_earnings[positions] = -np.abs(rng.uniform(1, 10, n_unprofitable))
+        df['net_earnings'] = net_earnings
+        df['profitability_ratio'] = df['net_earnings'] / df['trip_duration_min']
+
+    df['trip_bucket'] = pd.cut(df['trip_distance_km'], [0, 5, 10, 100], labels=['Short', 'Medium', 'Long'])
+    # In pickup-time order, so a date range is a contiguous block of rows
+    return add_time_dimensions(sort_by_time(df))
@@ -0,0 +1,17 @@
+"""
+Shared fixtures for the Driver Profitability Dashboard tests
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from source_utils import derive_trip_frame, load_trips
+
+@pytest.fixture(scope='session')
+def trips():
+    """Simulated trips with the dashboard's derived columns"""
+    return derive_trip_frame(load_trips(n_trips=20_000))
@@ -0,0 +1,80 @@
+"""
+Tests for the sufficient-statistics A/B engine against SciPy on raw values
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from ab_utils import AB_MEASURE, CONTROL, TREATMENT, SufficientStats, ab_test, cuped_test, welch_test
+from cube_utils import build_cube
+
+def group_stats(values, covariate=None):
+    """Single-segment statistics of one group"""
+    group = SufficientStats()
+    group.update(values, covariate)
+    return group
+
+@pytest.fixture(scope='module')
+def samples():
+    rng = np.random.default_rng(7)
+    x_c = rng.gamma(2.0, 3.0, 800)
+    x_t = rng.gamma(2.0, 3.0, 1_200)
+    # Skewed metric correlated with the covariate, unequal variances
+    y_c = 1.5 * x_c + rng.lognormal(0.0, 1.0, 800)
+    y_t = 1.5 * x_t + 0.4 + rng.lognormal(0.0, 1.3, 1_200)
+    return y_c, x_c, y_t, x_t
+
+def test_welch_matches_scipy(samples):
+    y_c, _, y_t, _ = samples
+    result = welch_test(group_stats(y_c), group_stats(y_t))
+    expected = stats.ttest_ind(y_t, y_c, equal_var=False)
+    np.testing.assert_allclose(result['t'], expected.statistic, rtol=1e-8)
+    np.testing.assert_allclose(result['p'], expected.pvalue, rtol=1e-6)
+    np.testing.assert_allclose(result['dof'], expected.df, rtol=1e-8)
+    np.testing.assert_allclose(result['lift'], (y_t.mean() - y_c.mean()) / y_c.mean() * 100, rtol=1e-10)
+
+def test_welch_per_segment_matches_scipy(samples):
+    y_c, _, y_t, _ = samples
+    seg_c, seg_t = np.arange(len(y_c)) % 3, np.arange(len(y_t)) % 3
+    control, treatment = SufficientStats(3), SufficientStats(3)
+    control.update(y_c, segments=seg_c)
+    treatment.update(y_t, segments=seg_t)
+    result = welch_test(control, treatment)
+    for segment in range(3):
+        expected = stats.ttest_ind(y_t[seg_t == segment], y_c[seg_c == segment], equal_var=False)
+        np.testing.assert_allclose(result['t'][segment], expected.statistic, rtol=1e-8)
+        np.testing.assert_allclose(result['p'][segment], expected.pvalue, rtol=1e-6)
+
+def test_streamed_updates_match_one_update(samples):
+    y_c, x_c, _, _ = samples
+    streamed = SufficientStats()
+    for chunk in range(0, len(y_c), 150):
+        streamed.update(y_c[chunk:chunk + 150], x_c[chunk:chunk + 150])
+    whole = group_stats(y_c, x_c)
+    for field in SufficientStats.FIELDS:
+        np.testing.assert_allclose(getattr(streamed, field), getattr(whole, field), rtol=1e-12)
+
+def test_cuped_matches_welch_on_adjusted_values(samples):
+    y_c, x_c, y_t, x_t = samples
+    result = cuped_test(group_stats(y_c, x_c), group_stats(y_t, x_t))
+    x, y = np.concatenate([x_c, x_t]), np.concatenate([y_c, y_t])
+    theta = np.cov(x, y)[0, 1] / x.var(ddof=1)
+    adjusted_c = y_c - theta * (x_c - x.mean())
+    adjusted_t = y_t - theta * (x_t - x.mean())
+    expected = stats.ttest_ind(adjusted_t, adjusted_c, equal_var=False)
+    np.testing.assert_allclose(result['theta'], theta, rtol=1e-8)
+    np.testing.assert_allclose(result['diff'], adjusted_t.mean() - adjusted_c.mean(), rtol=1e-8)
+    np.testing.assert_allclose(result['t'], expected.statistic, rtol=1e-6)
+    np.testing.assert_allclose(result['p'], expected.pvalue, rtol=1e-5, atol=1e-300)
+    assert 0 < result['variance_reduction'] < 1
+
+def test_ab_test_from_cube_matches_scipy_per_zone(trips):
+    results = ab_test(build_cube(trips), 'pickup_zone')
+    values = trips[AB_MEASURE].to_numpy(dtype=np.float64)
+    for zone, row in results.iterrows():
+        in_zone = (trips['pickup_zone'] == zone).to_numpy()
+        control = values[in_zone & (trips['ab_group'] == CONTROL).to_numpy()]
+        treatment = values[in_zone & (trips['ab_group'] == TREATMENT).to_numpy()]
+        assert (row['control_n'], row['treatment_n']) == (len(control), len(treatment))
+        np.testing.assert_allclose(row['p'], stats.ttest_ind(treatment, control, equal_var=False).pvalue, rtol=1e-6)
@@ -0,0 +1,59 @@
+"""
+Tests for the aggregate cube: every answer must match a groupby over the trips
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cube_utils import (CUBE_DIMENSIONS, build_cube, cube_rollups, cube_summary,
+                        cube_total_means, slice_cube)
+
+MEASURES = ['net_earnings', 'driver_payout', 'trip_distance_km']
+
+@pytest.fixture(scope='module')
+def cube(trips):
+    return build_cube(trips)
+
+@pytest.fixture(scope='module')
+def keyed(trips):
+    """Trips that belong to a cell (no missing dimension), in float64"""
+    df = trips.dropna(subset=CUBE_DIMENSIONS)
+    return df.astype({measure: np.float64 for measure in MEASURES})
+
+def test_cells_count_every_keyed_trip(cube, keyed):
+    assert cube['count'].sum() == len(keyed)
+    assert (cube['count'] > 0).all()
+
+@pytest.mark.parametrize('by', ['pickup_zone', ['driver_type', 'hour'], 'weekday'])
+def test_summary_matches_groupby(cube, keyed, by):
+    summary = cube_summary(cube, by, MEASURES)
+    expected = keyed.groupby(by, observed=True)[MEASURES].agg(['count', 'mean', 'std'])
+    np.testing.assert_array_equal(summary['count'], expected[(MEASURES[0], 'count')])
+    for measure in MEASURES:
+        np.testing.assert_allclose(summary[f'{measure}_mean'], expected[(measure, 'mean')], rtol=1e-9)
+        np.testing.assert_allclose(summary[f'{measure}_std'], expected[(measure, 'std')], rtol=1e-6)
+
+def test_summary_confidence_interval_brackets_mean(cube):
+    summary = cube_summary(cube, 'pickup_zone', ['net_earnings'], confidence=0.95)
+    assert (summary['net_earnings_ci_low'] < summary['net_earnings_mean']).all()
+    assert (summary['net_earnings_mean'] < summary['net_earnings_ci_high']).all()
+
+def test_rollups_match_groupby(cube, keyed):
+    groupings = {'zone': 'pickup_zone', 'hour_zone': ['hour', 'pickup_zone'], 'day': 'day'}
+    rollups = cube_rollups(cube, groupings, MEASURES)
+    for name, by in groupings.items():
+        expected = keyed.groupby(by, observed=True)[MEASURES].mean()
+        counts = keyed.groupby(by, observed=True).size()
+        np.testing.assert_array_equal(rollups[name]['count'], counts)
+        np.testing.assert_allclose(rollups[name][MEASURES], expected, rtol=1e-9)
+
+def test_sliced_means_match_filtered_trips(cube, keyed):
+    selections = {'pickup_zone': ['Downtown', 'Brampton'], 'ab_group': ['Treatment']}
+    mask = np.logical_and.reduce([keyed[dim].isin(allowed) for dim, allowed in selections.items()])
+    means = cube_total_means(slice_cube(cube, selections), MEASURES)
+    pd.testing.assert_series_equal(means, keyed.loc[mask, MEASURES].mean(), check_names=False, rtol=1e-9)
+
+def test_total_means_of_no_cells_are_nan(cube):
+    means = cube_total_means(slice_cube(cube, {'pickup_zone': []}), MEASURES)
+    assert means.isna().all()
@@ -0,0 +1,49 @@
+"""
+Tests for the bitmap filter index: selections must match boolean masks
+"""
+
+import numpy as np
+import pytest
+
+from index_utils import BitmapIndex
+
+DIMENSIONS = ['pickup_zone', 'driver_type', 'trip_bucket', 'ab_group']
+
+@pytest.fixture(scope='module')
+def index(trips):
+    return BitmapIndex(trips, DIMENSIONS)
+
+def expected_positions(df, selections):
+    mask = np.ones(len(df), dtype=bool)
+    for dim, allowed in selections.items():
+        mask &= df[dim].isin(allowed).to_numpy()
+    return np.flatnonzero(mask)
+
+@pytest.mark.parametrize('selections', [
+    {},
+    {'pickup_zone': ['Downtown']},
+    {'pickup_zone': ['Downtown', 'Scarborough', 'Brampton'], 'driver_type': ['Part-time']},
+    {'ab_group': ['Control'], 'trip_bucket': ['Short', 'Long'], 'driver_type': ['Full-time', 'Part-time']},
+    {'pickup_zone': ['Nowhere', 'Etobicoke']},
+    {'pickup_zone': []},
+])
+def test_positions_match_boolean_mask(index, trips, selections):
+    np.testing.assert_array_equal(index.positions(selections), expected_positions(trips, selections))
+
+def test_select_is_packed_mask(index, trips):
+    selections = {'pickup_zone': ['North York'], 'ab_group': ['Treatment']}
+    mask = np.zeros(len(trips), dtype=bool)
+    mask[expected_positions(trips, selections)] = True
+    np.testing.assert_array_equal(index.select(selections), np.packbits(mask))
+
+def test_select_leaves_bitmaps_unchanged(index, trips):
+    before = index.positions({'driver_type': ['Full-time']})
+    index.select({'driver_type': ['Full-time'], 'pickup_zone': ['Mississauga']})
+    np.testing.assert_array_equal(index.positions({'driver_type': ['Full-time']}), before)
+
+def test_row_count_not_multiple_of_eight(trips):
+    df = trips.iloc[:13]
+    index = BitmapIndex(df, DIMENSIONS)
+    np.testing.assert_array_equal(index.positions({}), np.arange(13))
+    selections = {'ab_group': ['Control']}
+    np.testing.assert_array_equal(index.positions(selections), expected_positions(df, selections))
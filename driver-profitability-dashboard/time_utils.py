@@ -0,0 +1,128 @@
+"""
+Time Dimensions for the Driver Profitability Dashboard
+
+Pickup times are reduced once, when data is loaded, to compact integer
+columns (hour of day, weekday, day number) that every hour, weekday and
+date grouping reads instead of re-deriving them from timestamps. Trips are
+kept sorted by pickup time, so a date range is a contiguous block of rows
+found with two binary searches.
+"""
+
+import numpy as np
+
+# Integer time columns added by add_time_dimensions
+TIME_DIMENSIONS = ['hour', 'weekday', 'day']
+
+# Weekday labels by 'weekday' value (Monday is 0, as in pandas)
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# 1970-01-01, day 0 of datetime64[D], was a Thursday
+_EPOCH_WEEKDAY = 3
+
+def pickup_hours(times):
+    """
+    Hour of day of each timestamp
+
+    Args:
+        times (pd.Series or np.ndarray): datetime64 values
+
+    Returns:
+        np.ndarray: uint8 hours, 0-23
+    """
+    hours = np.asarray(times, dtype='datetime64[h]').astype(np.int64)
+    return (hours % 24).astype(np.uint8)
+
+def add_time_dimensions(df, time_col='pickup_time'):
+    """
+    Add compact 'hour', 'weekday' and 'day' columns derived from a time column
+
+    'day' counts days from the first pickup date in the data.
+
+    Args:
+        df (pd.DataFrame): Frame with a datetime64 ``time_col``; modified in place
+        time_col (str): Timestamp column
+
+    Returns:
+        pd.DataFrame: df
+    """
+    times = df[time_col].to_numpy()
+    days = times.astype('datetime64[D]').astype(np.int64)
+    first_day = int(days.min()) if len(days) else 0
+    df['hour'] = pickup_hours(times)
+    df['weekday'] = ((days + _EPOCH_WEEKDAY) % 7).astype(np.uint8)
+    df['day'] = (days - first_day).astype(np.uint16)
+    return df
+
+def sort_by_time(df, time_col='pickup_time'):
+    """
+    Trips in pickup-time order with a fresh RangeIndex, as TimeIndex expects
+
+    Already sorted frames are returned as they are.
+
+    Args:
+        df (pd.DataFrame): Trip data
+        time_col (str): Timestamp column
+
+    Returns:
+        pd.DataFrame: Sorted frame
+    """
+    if df[time_col].is_monotonic_increasing:
+        return df
+    order = np.argsort(df[time_col].to_numpy(), kind='stable')
+    return df.take(order).reset_index(drop=True)
+
+class TimeIndex:
+    """Row ranges of trips sorted by pickup time, for date-range queries"""
+
+    def __init__(self, df, time_col='pickup_time'):
+        """
+        Args:
+            df (pd.DataFrame): Trips sorted by pickup time (see sort_by_time),
+                with the 'day' column from add_time_dimensions
+            time_col (str): Timestamp column
+        """
+        self.days = df['day'].to_numpy()
+        # Date of day 0, from the first trip's date and day number
+        self.first_day = (np.datetime64(df[time_col].iloc[0], 'D') - int(self.days[0])
+                          if len(self.days) else np.datetime64('1970-01-01'))
+        self.n_days = int(self.days[-1]) + 1 if len(self.days) else 0
+
+    def date(self, day):
+        """Calendar date of a day number"""
+        return (self.first_day + np.timedelta64(int(day), 'D')).astype(object)
+
+    def day_number(self, date):
+        """Day number of a calendar date (may fall outside the data)"""
+        return int((np.datetime64(date, 'D') - self.first_day).astype(np.int64))
+
+    def row_range(self, first, last):
+        """
+        Rows with pickups from day ``first`` through day ``last``
+
+        Args:
+            first (int): First day number included
+            last (int): Last day number included
+
+        Returns:
+            tuple: (start, stop) row positions, usable as a slice
+        """
+        # Bounds of the column's own dtype: a Python int would make
+        # searchsorted upcast the whole column first
+        first, last = np.clip([first, last], 0, np.iinfo(self.days.dtype).max).astype(self.days.dtype)
+        return (int(np.searchsorted(self.days, first, side='left')),
+                int(np.searchsorted(self.days, last, side='right')))
+
+    def restrict(self, positions, first, last):
+        """
+        Keep the sorted row positions whose pickups fall in a day range
+
+        Args:
+            positions (np.ndarray): Sorted row positions, e.g. from BitmapIndex.positions
+            first (int): First day number included
+            last (int): Last day number included
+
+        Returns:
+            np.ndarray: The positions within the range
+        """
+        start, stop = self.row_range(first, last)
+        return positions[np.searchsorted(positions, start):np.searchsorted(positions, stop)]
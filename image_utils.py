@@ -0,0 +1,153 @@
+import hashlib
+import os
+import threading
+from typing import Optional
+
+import plotly.io as pio
+
+from cache_utils import SharedLRUCache
+
+# Memory cap for rendered chart images kept in each process
+IMAGE_CACHE_MB = 256
+
+# Directory that images evicted from memory spill to; unset keeps the cache in memory only
+IMAGE_CACHE_DIR = os.environ.get("EXCELINSIGHT_IMAGE_CACHE_DIR")
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def figure_key(fig, width: int, height: int, format: str = "png") -> str:
+    """
+    Content hash of a figure rendered at a given size and format
+
+    Args:
+        fig: plotly.graph_objects.Figure
+        width: image width in pixels
+        height: image height in pixels
+        format: image format, e.g. "png"
+
+    Returns:
+        str: hex digest; figures with the same spec share a key
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{format}:{width}x{height}:".encode())
+    h.update(pio.to_json(fig, validate=False).encode())
+    return h.hexdigest()
+
+class ImageCache:
+    """Thread-safe LRU cache of rendered images, optionally spilling to disk"""
+
+    def __init__(self, max_bytes: float, disk_dir: Optional[str] = None):
+        """
+        Args:
+            max_bytes: total size above which least recently used images
+                leave memory (the newest image is always kept)
+            disk_dir: directory evicted images are written to and read back
+                from on a miss; None drops them
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._memory = SharedLRUCache(max_bytes, sizeof=len)
+        # Evicted images still being written to disk, served from here meanwhile
+        self._spilling = {}
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Cached image for ``key``, or None on a miss
+
+        Args:
+            key: hash from figure_key()
+
+        Returns:
+            bytes: the image, or None when it has to be rendered
+        """
+        data = self._memory.peek(key)
+        if data is None:
+            with self._lock:
+                data = self._spilling.get(key)
+        if data is None:
+            data = self._read_disk(key)
+            if data is not None:
+                self._spill(self._memory.put(key, data))
+        with self._lock:
+            if data is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        """
+        Store a rendered image
+
+        Args:
+            key: hash from figure_key()
+            data: the image bytes
+        """
+        self._spill(self._memory.put(key, data))
+
+    def _spill(self, evicted):
+        if not self.disk_dir or not evicted:
+            return
+        with self._lock:
+            self._spilling.update(evicted)
+        # Files are written without holding the lock; each one is published
+        # by an atomic rename and only then dropped from _spilling
+        for key, data in evicted:
+            self._write_disk(key, data)
+            with self._lock:
+                self._spilling.pop(key, None)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key)
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, data):
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Spilling is best effort; the image is simply rendered again
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def stats(self) -> dict:
+        """
+        Current cache occupancy and lookups
+
+        Returns:
+            dict: 'entries' and 'bytes' held in memory, 'hits' and 'misses'
+        """
+        with self._lock:
+            return {**self._memory.stats(), 'hits': self._hits, 'misses': self._misses}
+
+def shared_image_cache() -> ImageCache:
+    """
+    Image cache shared by every render in this process, created on first use
+
+    Returns:
+        ImageCache: cache bounded by IMAGE_CACHE_MB, spilling to IMAGE_CACHE_DIR when set
+    """
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ImageCache(IMAGE_CACHE_MB * 1024 * 1024, IMAGE_CACHE_DIR)
+        return _shared_cache
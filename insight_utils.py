@@ -1,4 +1,5 @@
 from typing import List
+import numpy as np
 import pandas as pd
 import re
 
@@ -12,23 +13,70 @@ def _metric_phrase(metric: str) -> str:
         return "commands the largest share"
     return "has the highest total value"
 
+def _metric_pass(df: pd.DataFrame, metric_cols: List[str]):
+    """Scan the metric columns once, one column at a time.
+
+    Returns each metric's total and the row position of its maximum (first on
+    ties), plus each row's largest value and smallest positive value across
+    metrics. NaNs are skipped like pandas' sum() and idxmax() do.
+    """
+    n_rows = len(df)
+    totals = np.empty(len(metric_cols))
+    max_rows = np.empty(len(metric_cols), dtype=np.intp)
+    row_max = np.full(n_rows, -np.inf)
+    row_min_pos = np.full(n_rows, np.inf)
+    for i, col in enumerate(metric_cols):
+        values = df[col].to_numpy(dtype=np.float64)
+        nan_mask = np.isnan(values)
+        if nan_mask.any():
+            if nan_mask.all():
+                raise ValueError("attempt to get argmax of an empty sequence")
+            values = np.where(nan_mask, -np.inf, values)
+            totals[i] = values[~nan_mask].sum()
+        else:
+            totals[i] = values.sum()
+        max_rows[i] = values.argmax()
+        np.maximum(row_max, values, out=row_max)
+        np.minimum(row_min_pos, values, out=row_min_pos, where=values > 0)
+    return totals, max_rows, row_max, row_min_pos
+
+def _first_double(df: pd.DataFrame, metric_cols: List[str], row_max: np.ndarray, row_min_pos: np.ndarray):
+    """Return (row, a, b) of the first metric pair where a >= 2 * b and b > 0, or None.
+
+    Scans rows in order, then metrics a, then metrics b, like a nested loop
+    would. A row qualifies exactly when its largest value is at least twice
+    its smallest positive value, so only the first qualifying row is searched
+    pairwise.
+    """
+    if len(metric_cols) < 2:
+        return None
+    hits = np.flatnonzero(row_max >= 2 * row_min_pos)
+    if len(hits) == 0:
+        return None
+    row = hits[0]
+    vals = np.array([df[col].iloc[row] for col in metric_cols], dtype=np.float64)
+    pairs = (vals[:, None] >= 2 * vals[None, :]) & (vals[None, :] > 0)
+    a = np.flatnonzero(pairs.any(axis=1))[0]
+    b = np.flatnonzero(pairs[a])[0]
+    return row, a, b
+
 def generate_insights(df: pd.DataFrame, category_col: str, metric_cols: List[str]) -> List[str]:
     insights = []
+    totals, max_rows, row_max, row_min_pos = _metric_pass(df, metric_cols)
+    categories = df[category_col]
+    metric_totals = pd.Series(totals, index=metric_cols)
+
     # 1. Which metric has the highest total value across all segments?
-    metric_totals = df[metric_cols].sum()
     max_metric = metric_totals.idxmax()
     phrase = _metric_phrase(max_metric)
     insights.append(f"{max_metric} {phrase} across all segments.")
 
-    # 2. Which segment has the highest value for each metric?
-    for col in metric_cols:
-        idx = df[col].idxmax()
-        seg = df.loc[idx, category_col]
-        val = df.loc[idx, col]
-        phrase = _metric_phrase(col)
-        insights.append(f"{seg} has the highest {col} value ({val:,}) and {phrase}.")
-        if len(insights) >= 2:
-            break
+    # 2. Which segment has the highest value for the first metric?
+    col = metric_cols[0]
+    seg = categories.iloc[max_rows[0]]
+    val = df[col].iloc[max_rows[0]]
+    phrase = _metric_phrase(col)
+    insights.append(f"{seg} has the highest {col} value ({val:,}) and {phrase}.")
 
     # 3. % contribution of each metric to total
     total_sum = metric_totals.sum()
@@ -41,23 +89,17 @@ def generate_insights(df: pd.DataFrame, category_col: str, metric_cols: List[str
             insights.append(f"{top_metric} {phrase}, contributing {pct:.0f}% of the total.")
 
     # 4. Detect if any metric is 2x another within same category
-    for i, row in df.iterrows():
-        vals = row[metric_cols]
-        for a in metric_cols:
-            for b in metric_cols:
-                if a != b and vals[a] >= 2 * vals[b] and vals[b] > 0:
-                    insights.append(f"{row[category_col]}'s {a} is double that of {b}.")
-                    break
-            if len(insights) >= 3:
-                break
-        if len(insights) >= 3:
-            break
+    double = _first_double(df, metric_cols, row_max, row_min_pos)
+    if double is not None:
+        row, a, b = double
+        # Row values as df.iterrows() would give them (upcast to the frame's common dtype)
+        seg = df.iloc[row:row + 1].to_numpy()[0, df.columns.get_loc(category_col)]
+        insights.append(f"{seg}'s {metric_cols[a]} is double that of {metric_cols[b]}.")
 
     # 5. Flag if any segment is dominant across multiple metrics
     segment_wins = {}
-    for col in metric_cols:
-        idx = df[col].idxmax()
-        seg = df.loc[idx, category_col]
+    for row in max_rows:
+        seg = categories.iloc[row]
         segment_wins[seg] = segment_wins.get(seg, 0) + 1
     dominant = [seg for seg, count in segment_wins.items() if count > 1]
     if dominant:
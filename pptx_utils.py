@@ -1,35 +1,165 @@
 import pandas as pd
 import plotly.graph_objects as go
+import plotly.io as pio
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 import io
-import base64
-from PIL import Image
-import tempfile
+from collections import deque
+import functools
+import multiprocessing
 import os
+import threading
+import time
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from image_utils import figure_key, shared_image_cache
+from profile_utils import profile_sheet
 import warnings
 warnings.filterwarnings('ignore')
 
-def figure_to_image(fig, width=800, height=600):
+# Processes rasterizing charts; each keeps its own renderer warm between exports
+RENDER_WORKERS = min(4, os.cpu_count() or 1)
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+def _start_renderer():
+    """Keep one Kaleido browser alive per render process (Kaleido >= 1)"""
+    try:
+        import kaleido
+        # Fails fast when Chrome is missing; a server started without it
+        # would leave every render waiting forever
+        kaleido.Kaleido()
+        kaleido.start_sync_server(silence_warnings=True)
+    except (ImportError, AttributeError, RuntimeError):
+        # Older Kaleido keeps its own renderer process alive already, and
+        # without Chrome each render reports the error itself
+        pass
+
+def _render_png(fig_dict, width, height):
+    return pio.to_image(fig_dict, format="png", width=width, height=height, validate=False)
+
+def render_pool():
+    """
+    Pool shared by every chart export, started on first use
+    
+    Returns:
+        Executor: RENDER_WORKERS render processes, or a single render thread
+        when only one worker is configured
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            if RENDER_WORKERS <= 1:
+                # A single render process would only add IPC; render on a
+                # background thread of this one instead
+                _render_pool = ThreadPoolExecutor(max_workers=1, initializer=_start_renderer)
+            else:
+                # Spawn rather than fork: the Streamlit server is multi-threaded
+                _render_pool = ProcessPoolExecutor(
+                    max_workers=RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_start_renderer,
+                )
+        return _render_pool
+
+def _reset_render_pool(pool):
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _render_done(pool, cache, key, future):
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is None:
+        cache.put(key, future.result())
+    elif isinstance(error, BrokenExecutor):
+        # A render process died; the next export starts a fresh pool
+        _reset_render_pool(pool)
+
+def _submit_render(spec, width, height):
+    pool = render_pool()
+    try:
+        return pool, pool.submit(_render_png, spec, width, height)
+    except BrokenExecutor:
+        # A render process died in an earlier export; start a fresh pool
+        _reset_render_pool(pool)
+        pool = render_pool()
+        return pool, pool.submit(_render_png, spec, width, height)
+
+def submit_renders(figs, width=800, height=500):
     """
-    Convert a Plotly figure to a PIL Image
+    Start rasterizing figures to PNG bytes without waiting for them
+    
+    Images come from the shared image cache when an identical figure was
+    rendered at the same size before; the rest are queued on the shared
+    render pool and cached once rendered. Identical figures share one render.
     
     Args:
-        fig: plotly.graph_objects.Figure
+        figs: list of plotly.graph_objects.Figure
+        width: image width in pixels
+        height: image height in pixels
+        
+    Returns:
+        list: a Future per figure resolving to its PNG bytes
+    """
+    cache = shared_image_cache()
+    futures = []
+    by_key = {}
+    for fig in figs:
+        key = figure_key(fig, width, height)
+        if key not in by_key:
+            png = cache.get(key)
+            if png is not None:
+                future = Future()
+                future.set_result(png)
+            else:
+                pool, future = _submit_render(fig.to_dict(), width, height)
+                future.add_done_callback(functools.partial(_render_done, pool, cache, key))
+            by_key[key] = future
+        futures.append(by_key[key])
+    return futures
+
+def _result_or_error(future):
+    try:
+        return future.result()
+    except Exception as e:
+        return e
+
+def render_figures(figs, width=800, height=500):
+    """
+    Rasterize figures to PNG bytes, rendering only those not already cached
+    
+    Args:
+        figs: list of plotly.graph_objects.Figure
         width: image width in pixels
         height: image height in pixels
         
     Returns:
-        PIL.Image: The figure as an image
+        list: PNG bytes for each figure, or the exception raised rendering it
     """
-    # Convert figure to image bytes
-    img_bytes = fig.to_image(format="png", width=width, height=height)
+    return [_result_or_error(future) for future in submit_renders(figs, width, height)]
+
+def render_figure(fig, width=800, height=500):
+    """
+    Rasterize one figure to PNG bytes through the image cache
     
-    # Convert bytes to PIL Image
-    img = Image.open(io.BytesIO(img_bytes))
-    return img
+    Args:
+        fig: plotly.graph_objects.Figure
+        width: image width in pixels
+        height: image height in pixels
+        
+    Returns:
+        bytes: The PNG image
+    """
+    png = render_figures([fig], width=width, height=height)[0]
+    if isinstance(png, Exception):
+        raise png
+    return png
 
 def create_title_slide(prs, title="ExcelInsight Analysis"):
     """
@@ -60,7 +190,7 @@ def create_title_slide(prs, title="ExcelInsight Analysis"):
     
     return slide
 
-def create_chart_slide(prs, fig, chart_info, slide_number):
+def create_chart_slide(prs, fig, chart_info, slide_number, png=None):
     """
     Create a slide with a chart
     
@@ -69,6 +199,7 @@ def create_chart_slide(prs, fig, chart_info, slide_number):
         fig: plotly.graph_objects.Figure
         chart_info: dictionary with chart information
         slide_number: slide number for title
+        png: the chart already rendered to PNG bytes; rendered here when None
         
     Returns:
         slide: The created slide
@@ -92,34 +223,28 @@ def create_chart_slide(prs, fig, chart_info, slide_number):
     subtitle_frame.paragraphs[0].font.color.rgb = RGBColor(100, 100, 100)
     subtitle_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
     
-    # Convert figure to image
-    img = figure_to_image(fig, width=800, height=500)
-    
-    # Save image to temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmp_file:
-        img_path = tmp_file.name
-        img.save(img_path)
-    
-    # Add image to slide
-    try:
-        slide.shapes.add_picture(img_path, Inches(1), Inches(2), Inches(8), Inches(5))
-    finally:
-        # Clean up temporary file
-        os.unlink(img_path)
+    # Add the PNG to the slide straight from memory
+    if png is None:
+        png = render_figure(fig, width=800, height=500)
+    slide.shapes.add_picture(io.BytesIO(png), Inches(1), Inches(2), Inches(8), Inches(5))
     
     return slide
 
-def create_data_profiling_slide(prs, df):
+def create_data_profiling_slide(prs, df, stats=None):
     """
     Create a slide with data profiling information
     
     Args:
         prs: Presentation object
         df: pandas DataFrame
+        stats: profile of df from profile_utils.profile_sheet; computed when None
         
     Returns:
         slide: The created slide
     """
+    if stats is None:
+        stats = profile_sheet(df)
+    
     slide_layout = prs.slide_layouts[5]  # Blank layout
     slide = prs.slides.add_slide(slide_layout)
     
@@ -134,27 +259,27 @@ def create_data_profiling_slide(prs, df):
     # Create profiling information
     profiling_info = []
     profiling_info.append(f"📊 Dataset Overview")
-    profiling_info.append(f"• Total Rows: {len(df):,}")
-    profiling_info.append(f"• Total Columns: {len(df.columns)}")
-    profiling_info.append(f"• Memory Usage: {df.memory_usage(deep=True).sum() / 1024:.1f} KB")
+    profiling_info.append(f"• Total Rows: {stats['rows']:,}")
+    profiling_info.append(f"• Total Columns: {len(stats['columns'])}")
+    profiling_info.append(f"• Memory Usage: {stats['memory_bytes'] / 1024:.1f} KB")
     profiling_info.append("")
     
     # Column information
     profiling_info.append("📋 Column Analysis")
-    for col in df.columns:
-        col_type = str(df[col].dtype)
-        null_count = df[col].isnull().sum()
-        null_pct = (null_count / len(df)) * 100
+    for col, info in stats['columns'].items():
+        null_pct = (info['nulls'] / stats['rows'] * 100) if stats['rows'] else 0.0
         
-        profiling_info.append(f"• {col}: {col_type}")
-        profiling_info.append(f"  - Null values: {null_count} ({null_pct:.1f}%)")
+        profiling_info.append(f"• {col}: {info['dtype']}")
+        profiling_info.append(f"  - Null values: {info['nulls']} ({null_pct:.1f}%)")
         
-        if pd.api.types.is_numeric_dtype(df[col]):
-            profiling_info.append(f"  - Range: {df[col].min():.2f} to {df[col].max():.2f}")
-        elif pd.api.types.is_datetime64_any_dtype(df[col]):
-            profiling_info.append(f"  - Date range: {df[col].min()} to {df[col].max()}")
+        if info['group'] == "numeric":
+            profiling_info.append(f"  - Range: {info['min']:.2f} to {info['max']:.2f}")
+        elif info['group'] == "datetime":
+            profiling_info.append(f"  - Date range: {info['min']} to {info['max']}")
+        elif info['distinct_exact']:
+            profiling_info.append(f"  - Unique values: {info['distinct']}")
         else:
-            profiling_info.append(f"  - Unique values: {df[col].nunique()}")
+            profiling_info.append(f"  - Unique values: ~{info['distinct']:,}")
     
     # Add profiling text to slide
     text_box = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(6))
@@ -168,17 +293,41 @@ def create_data_profiling_slide(prs, df):
     
     return slide
 
-def create_powerpoint_deck(df, chart_candidates, output_path, include_profiling=False):
+def create_sheet_slide(prs, sheet_name, insights):
     """
-    Create a PowerPoint presentation with charts and optional data profiling
+    Create a slide opening the section of one sheet
     
     Args:
-        df: pandas DataFrame
-        chart_candidates: list of chart candidate dictionaries
-        output_path: path to save the PowerPoint file
-        include_profiling: whether to include data profiling slide
+        prs: Presentation object
+        sheet_name: name of the sheet
+        insights: list of insight strings for the sheet
+        
+    Returns:
+        slide: The created slide
     """
-    # Create presentation
+    slide_layout = prs.slide_layouts[5]  # Blank layout
+    slide = prs.slides.add_slide(slide_layout)
+    
+    # Add title
+    title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
+    title_frame = title_box.text_frame
+    title_frame.text = f"Sheet: {sheet_name}"
+    title_frame.paragraphs[0].font.size = Pt(28)
+    title_frame.paragraphs[0].font.color.rgb = RGBColor(18, 85, 181)
+    title_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+    
+    # Add insights as bullets
+    text_box = slide.shapes.add_textbox(Inches(0.5), Inches(1.5), Inches(9), Inches(5))
+    text_frame = text_box.text_frame
+    text_frame.word_wrap = True
+    text_frame.text = "\n".join(f"• {insight}" for insight in insights)
+    for paragraph in text_frame.paragraphs:
+        paragraph.font.size = Pt(16)
+        paragraph.font.color.rgb = RGBColor(50, 50, 50)
+    
+    return slide
+
+def _new_presentation():
     prs = Presentation()
     
     # Set slide dimensions (16:9 aspect ratio)
@@ -187,26 +336,119 @@ def create_powerpoint_deck(df, chart_candidates, output_path, include_profiling=
     
     # Create title slide
     create_title_slide(prs)
+    return prs
+
+def _build_charts(df, chart_candidates, first_number=1):
+    # Import here to avoid circular imports
+    from chart_utils import ChartData, create_chart
+    
+    # The charts share column arrays extracted once from df
+    data = ChartData(df)
+    charts = []
+    for i, chart_info in enumerate(chart_candidates, start=first_number):
+        try:
+            charts.append((i, chart_info, create_chart(df, chart_info, data=data)))
+        except Exception as e:
+            print(f"Warning: Could not create chart {i}: {str(e)}")
+    return charts
+
+def _add_chart_slides(prs, charts, images):
+    for (i, chart_info, fig), png in zip(charts, images):
+        try:
+            if isinstance(png, Exception):
+                raise png
+            create_chart_slide(prs, fig, chart_info, i, png=png)
+        except Exception as e:
+            print(f"Warning: Could not create chart {i}: {str(e)}")
+
+def create_powerpoint_deck(df, chart_candidates, output_path, include_profiling=False, stats=None):
+    """
+    Create a PowerPoint presentation with charts and optional data profiling
+    
+    Args:
+        df: pandas DataFrame
+        chart_candidates: list of chart candidate dictionaries
+        output_path: path to save the PowerPoint file
+        include_profiling: whether to include data profiling slide
+        stats: profile of df from profile_utils.profile_sheet, reused by
+            the profiling slide; computed when None
+    """
+    prs = _new_presentation()
     
     # Add data profiling slide if requested
     if include_profiling:
-        create_data_profiling_slide(prs, df)
+        create_data_profiling_slide(prs, df, stats=stats)
     
-    # Create chart slides
-    for i, chart_info in enumerate(chart_candidates):
-        try:
-            # Import here to avoid circular imports
-            from chart_utils import create_chart
-            
-            # Create the chart
-            fig = create_chart(df, chart_info)
-            
-            # Create slide with chart
-            create_chart_slide(prs, fig, chart_info, i + 1)
-            
-        except Exception as e:
-            print(f"Warning: Could not create chart {i+1}: {str(e)}")
-            continue
+    # Build every chart first so they can be rasterized together
+    charts = _build_charts(df, chart_candidates)
+    
+    # Render all charts concurrently, then add the slides in order
+    images = render_figures([fig for _, _, fig in charts], width=800, height=500)
+    _add_chart_slides(prs, charts, images)
+    
+    # Save the presentation
+    prs.save(output_path)
+
+def create_workbook_deck(sheets, output_path, progress=None, timings=None):
+    """
+    Create one PowerPoint presentation covering several sheets
+    
+    Each sheet gets a slide with its insights followed by its charts. Charts
+    are queued on the shared render pool as soon as a sheet arrives, and a
+    sheet's slides are added once its images are ready, so ``sheets`` can be
+    a generator still analyzing later sheets while earlier ones render.
+    
+    Args:
+        sheets: iterable of dicts with 'name', 'df', 'charts' (chart
+            candidate dictionaries) and 'insights' (list of str)
+        output_path: path or file object to save the PowerPoint file to
+        progress: optional callable(sheets_done, sheet_name) called after
+            each sheet's slides are added
+        timings: optional dict; seconds spent building figures ('chart'),
+            queueing and waiting for images ('render') and adding slides
+            and saving ('save') are added to it
+        
+    Returns:
+        int: number of chart slides in the deck
+    """
+    prs = _new_presentation()
+    queued = deque()
+    n_charts = 0
+    n_sheets = 0
+    spent = {'chart': 0.0, 'render': 0.0, 'save': 0.0}
+    
+    def add_sheet(sheet, charts, futures):
+        nonlocal n_sheets
+        start = time.perf_counter()
+        images = [_result_or_error(future) for future in futures]
+        added = time.perf_counter()
+        create_sheet_slide(prs, sheet['name'], sheet['insights'])
+        _add_chart_slides(prs, charts, images)
+        spent['render'] += added - start
+        spent['save'] += time.perf_counter() - added
+        n_sheets += 1
+        if progress is not None:
+            progress(n_sheets, sheet['name'])
+    
+    for sheet in sheets:
+        start = time.perf_counter()
+        charts = _build_charts(sheet['df'], sheet['charts'], first_number=n_charts + 1)
+        n_charts += len(sheet['charts'])
+        built = time.perf_counter()
+        queued.append((sheet, charts, submit_renders([fig for _, _, fig in charts], width=800, height=500)))
+        spent['chart'] += built - start
+        spent['render'] += time.perf_counter() - built
+        # Keep sheet order: add every leading sheet whose images are ready
+        while queued and all(future.done() for future in queued[0][2]):
+            add_sheet(*queued.popleft())
+    while queued:
+        add_sheet(*queued.popleft())
     
     # Save the presentation
-    prs.save(output_path) 
\ No newline at end of file
+    start = time.perf_counter()
+    prs.save(output_path)
+    spent['save'] += time.perf_counter() - start
+    if timings is not None:
+        for stage, seconds in spent.items():
+            timings[stage] = timings.get(stage, 0.0) + seconds
+    return len(prs.slides) - 1 - n_sheets
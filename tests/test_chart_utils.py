@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from chart_utils import MAX_CHART_CATEGORIES, MAX_CHART_POINTS, create_chart, reduce_chart_data
+
+METRICS = ["Revenue", "Cost"]
+
+def metric_frame(categories, seed=0):
+    rng = np.random.default_rng(seed)
+    n = len(categories)
+    return pd.DataFrame({"Segment": categories, "Revenue": rng.gamma(2.0, 50.0, n), "Cost": rng.gamma(2.0, 20.0, n)})
+
+def assert_totals_kept(df, frame):
+    np.testing.assert_allclose(frame[METRICS].sum().to_numpy(), df[METRICS].sum().to_numpy(), rtol=1e-9)
+
+@pytest.mark.parametrize("categories", [
+    [f"Customer {i}" for i in range(5_000)],
+    np.random.default_rng(1).integers(0, 800, 5_000),  # numeric IDs with repeats
+    np.arange(2_000, 7_000),
+])
+def test_top_n_keeps_totals(categories):
+    df = metric_frame(categories)
+    frame, info = reduce_chart_data(df, "Segment", METRICS)
+    assert info["method"] == "top_n"
+    assert len(frame) == MAX_CHART_CATEGORIES
+    assert frame["Segment"].iloc[-1].startswith("Other")
+    assert_totals_kept(df, frame)
+
+def test_numeric_ids_are_not_downsampled_for_bars():
+    df = metric_frame(np.arange(1_000))
+    fig = create_chart(df, {"type": "Stacked Bar", "columns": ["Segment", *METRICS]})
+    assert len(fig.data[0].x) == MAX_CHART_CATEGORIES
+    np.testing.assert_allclose(sum(np.sum(trace.y) for trace in fig.data), df[METRICS].to_numpy().sum())
+
+def test_date_axis_is_summed_into_ranges():
+    df = metric_frame(pd.date_range("2024-01-01", periods=10_000, freq="h"))
+    df.loc[5, "Segment"] = pd.NaT
+    frame, info = reduce_chart_data(df, "Segment", METRICS)
+    assert info["method"] == "bucket"
+    assert len(frame) <= MAX_CHART_POINTS + 1
+    assert frame["Segment"].iloc[:-1].is_monotonic_increasing
+    assert pd.isna(frame["Segment"].iloc[-1])
+    assert_totals_kept(df, frame)
+
+def test_lttb_only_when_asked():
+    df = metric_frame(np.arange(5_000, dtype=np.float64))
+    frame, info = reduce_chart_data(df, "Segment", METRICS, method="lttb")
+    assert info["method"] == "lttb"
+    assert len(frame) == MAX_CHART_POINTS
+
+def test_small_sheets_pass_through():
+    df = metric_frame(["North", "South", "North", "East"])
+    frame, info = reduce_chart_data(df, "Segment", METRICS)
+    assert info["method"] == "none"
+    pd.testing.assert_frame_equal(frame, df)
+
+def test_duplicates_summed_past_the_limit():
+    labels = [f"Region {i % MAX_CHART_CATEGORIES}" for i in range(3 * MAX_CHART_CATEGORIES)]
+    df = metric_frame(labels)
+    frame, info = reduce_chart_data(df, "Segment", METRICS)
+    assert info["method"] == "group"
+    assert len(frame) == MAX_CHART_CATEGORIES
+    assert_totals_kept(df, frame)
+
+def test_reduce_none_keeps_every_row():
+    df = metric_frame(np.arange(1_000))
+    frame, info = reduce_chart_data(df, "Segment", METRICS, method=None)
+    assert info["method"] == "none" and len(frame) == len(df)
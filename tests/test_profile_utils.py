@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from profile_utils import EXACT_DISTINCT_MAX, HLL_PRECISION, HyperLogLog, profile_sheet
+
+# Standard error of a HyperLogLog estimate with 2 ** HLL_PRECISION registers (~0.8%)
+HLL_STANDARD_ERROR = 1.04 / np.sqrt(2 ** HLL_PRECISION)
+
+def distinct_hashes(n, seed):
+    return np.random.default_rng(seed).integers(0, 2 ** 64, size=n, dtype=np.uint64, endpoint=False)
+
+@pytest.mark.parametrize("n", [50_000, 200_000, 1_000_000])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_hll_error_within_bound(n, seed):
+    sketch = HyperLogLog()
+    sketch.add_hashes(distinct_hashes(n, seed))
+    # 4 standard errors: a false failure is about 1 in 16,000 runs
+    assert abs(sketch.count() - n) / n < 4 * HLL_STANDARD_ERROR
+
+def test_hll_small_counts_use_linear_counting():
+    sketch = HyperLogLog()
+    sketch.add_hashes(distinct_hashes(500, 3))
+    assert abs(sketch.count() - 500) <= 5
+
+def test_hll_ignores_duplicates():
+    hashes = distinct_hashes(100_000, 4)
+    once, thrice = HyperLogLog(), HyperLogLog()
+    once.add_hashes(hashes)
+    thrice.add_hashes(np.concatenate([hashes, hashes[::-1], hashes]))
+    assert once.count() == thrice.count()
+
+def test_hll_merge_equals_union():
+    hashes = distinct_hashes(300_000, 5)
+    whole, left, right = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    whole.add_hashes(hashes)
+    left.add_hashes(hashes[:200_000])
+    right.add_hashes(hashes[100_000:])
+    left.merge(right)
+    np.testing.assert_array_equal(left.registers, whole.registers)
+
+def test_hll_rejects_mismatched_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(14))
+    with pytest.raises(ValueError):
+        HyperLogLog(8)
+
+def test_profile_sheet_counts_high_cardinality_columns_approximately():
+    n = 4 * EXACT_DISTINCT_MAX
+    df = pd.DataFrame({
+        "id": [f"ID_{i}" for i in range(n)],
+        "segment": np.arange(n) % 7,
+        "value": np.arange(n, dtype=np.float64),
+    })
+    df.loc[::10, "value"] = np.nan
+    columns = profile_sheet(df)["columns"]
+    assert columns["segment"]["distinct_exact"] and columns["segment"]["distinct"] == 7
+    for col, distinct in (("id", n), ("value", n - n // 10)):
+        assert not columns[col]["distinct_exact"]
+        assert abs(columns[col]["distinct"] - distinct) / distinct < 4 * HLL_STANDARD_ERROR
+    assert columns["value"]["nulls"] == n // 10
@@ -0,0 +1,161 @@
+import hashlib
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from typing import Dict, List
+
+import pandas as pd
+
+from cache_utils import SharedLRUCache
+from chart_utils import profile_columns
+from profile_utils import profile_sheet
+
+# Memory cap for parsed workbooks kept across reruns and sessions
+WORKBOOK_CACHE_MB = 512
+
+# Processes parsing the sheets of a large workbook side by side
+PARSE_WORKERS = os.cpu_count() or 1
+
+# Workbooks below this size parse in-process; starting workers would cost more
+PARALLEL_PARSE_MIN_MB = 2
+
+def workbook_key(data: bytes) -> str:
+    """
+    Content hash identifying an uploaded workbook
+
+    Args:
+        data: raw bytes of the uploaded file
+
+    Returns:
+        str: hex digest; identical uploads share a key whatever their file name
+    """
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+class ParsedWorkbook:
+    """Every sheet of a workbook, parsed once"""
+
+    def __init__(self, sheet_names: List[str], sheets: Dict[str, pd.DataFrame], errors: Dict[str, Exception]):
+        self.sheet_names = sheet_names
+        self.sheets = sheets
+        self.errors = errors
+        self.parse_seconds = 0.0
+        self._profiles = {}
+        self._stats = {}
+        self.sheet_bytes = {name: int(df.memory_usage(deep=True).sum()) for name, df in sheets.items()}
+        self.nbytes = sum(self.sheet_bytes.values())
+
+    def sheet(self, name: str) -> pd.DataFrame:
+        """
+        Parsed frame of one sheet; shared between reruns, so treat it as read-only
+
+        Raises:
+            The exception raised while parsing the sheet, if it failed
+        """
+        if name in self.errors:
+            raise self.errors[name]
+        return self.sheets[name]
+
+    def profile(self, name: str) -> dict:
+        """
+        Column profile of one sheet (see chart_utils.profile_columns), computed on first use
+
+        Raises:
+            The exception raised while parsing the sheet, if it failed
+        """
+        profile = self._profiles.get(name)
+        if profile is None:
+            # Concurrent first calls may both compute it; the results are identical
+            profile = self._profiles.setdefault(name, profile_columns(self.sheet(name)))
+        return profile
+
+    def stats(self, name: str) -> dict:
+        """
+        Null counts, ranges and distinct counts of one sheet (see
+        profile_utils.profile_sheet), computed on first use
+
+        Raises:
+            The exception raised while parsing the sheet, if it failed
+        """
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats.setdefault(name, profile_sheet(self.sheet(name), self.profile(name), self.sheet_bytes[name]))
+        return stats
+
+def _parse_sheets(excel_file, names):
+    sheets = {}
+    errors = {}
+    for name in names:
+        try:
+            sheets[name] = excel_file.parse(name)
+        except Exception as e:
+            errors[name] = e
+    return sheets, errors
+
+def _parse_sheet_group(data, names):
+    with pd.ExcelFile(io.BytesIO(data)) as excel_file:
+        return _parse_sheets(excel_file, names)
+
+def _parse_parallel(data, sheet_names, workers):
+    # Deal the sheets out round-robin so large neighbouring sheets spread
+    # across workers; each worker opens the file once for its whole group
+    groups = [sheet_names[i::workers] for i in range(workers)]
+    sheets = {}
+    errors = {}
+    # Spawn rather than fork: the Streamlit server is multi-threaded
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for group_sheets, group_errors in pool.map(_parse_sheet_group, [data] * workers, groups):
+            sheets.update(group_sheets)
+            errors.update(group_errors)
+    return sheets, errors
+
+def parse_workbook(data: bytes, workers: int = PARSE_WORKERS) -> ParsedWorkbook:
+    """
+    Parse all sheets of a workbook
+
+    Workbooks of at least PARALLEL_PARSE_MIN_MB with more than one sheet are
+    parsed in parallel, the sheets split between up to ``workers`` processes;
+    smaller ones are parsed in one pass over the file. A sheet that fails to
+    parse is recorded in ``errors`` instead of failing the whole workbook.
+
+    Args:
+        data: raw bytes of an .xls or .xlsx file
+        workers: most processes to parse with; 1 parses in-process
+
+    Returns:
+        ParsedWorkbook: the parsed sheets
+    """
+    start = time.perf_counter()
+    with pd.ExcelFile(io.BytesIO(data)) as excel_file:
+        sheet_names = list(excel_file.sheet_names)
+        workers = min(workers, len(sheet_names))
+        if workers <= 1 or len(data) < PARALLEL_PARSE_MIN_MB * 1024 * 1024:
+            sheets, errors = _parse_sheets(excel_file, sheet_names)
+            workers = 1
+    if workers > 1:
+        try:
+            sheets, errors = _parse_parallel(data, sheet_names, workers)
+        except BrokenExecutor:
+            # A worker died (e.g. out of memory); retry in this process
+            with pd.ExcelFile(io.BytesIO(data)) as excel_file:
+                sheets, errors = _parse_sheets(excel_file, sheet_names)
+    workbook = ParsedWorkbook(sheet_names, sheets, errors)
+    workbook.parse_seconds = time.perf_counter() - start
+    return workbook
+
+class WorkbookCache(SharedLRUCache):
+    """
+    Thread-safe LRU cache of parsed workbooks bounded by their total size
+
+    get(key, build) parses a workbook on a miss; concurrent misses on the
+    same content hash parse it only once.
+    """
+
+    def __init__(self, max_bytes: float):
+        """
+        Args:
+            max_bytes: total size above which least recently used workbooks
+                are evicted (the newest entry is always kept)
+        """
+        super().__init__(max_bytes, sizeof=lambda workbook: workbook.nbytes)